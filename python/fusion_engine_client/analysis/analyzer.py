@@ -3,8 +3,14 @@
 from typing import Tuple, Union, List, Any
 
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import bisect
+import functools
 import logging
+import multiprocessing
 import os
+import pathlib
+import re
 import sys
 import webbrowser
 
@@ -12,7 +18,17 @@ from gpstime import gpstime
 import plotly
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
-from pymap3d import geodetic2ecef
+
+# If available, use orjson to serialize figures when writing them to disk (plotly>=5.0). It is significantly faster than
+# the standard library JSON encoder for figures with large numeric arrays. The engine is passed to each to_json() call,
+# rather than set in Plotly's global configuration, so other users of Plotly are not affected.
+_TO_JSON_ARGS = {}
+try:
+    import orjson  # noqa: F401
+    if hasattr(plotly.io, 'json') and hasattr(plotly.io.json, 'config'):
+        _TO_JSON_ARGS['engine'] = 'orjson'
+except ImportError:
+    pass
 
 # If running as a script, add fusion-engine-client/ to the Python import path and correct __package__ to enable relative
 # imports.
@@ -22,7 +38,7 @@ if __name__ == "__main__" and (__package__ is None or __package__ == ''):
     __package__ = "fusion_engine_client.analysis"
 
 from ..messages import *
-from .attitude import get_enu_rotation_matrix
+from .attitude import geodetic_to_ecef, get_enu_rotation_matrix
 from .file_reader import FileReader
 from ..utils import trace
 from ..utils.argument_parser import ArgumentParser
@@ -32,6 +48,8 @@ _logger = logging.getLogger('point_one.fusion_engine.analysis.analyzer')
 
 SolutionTypeInfo = namedtuple('SolutionTypeInfo', ['name', 'style'])
 
+SECS_PER_WEEK = 7 * 24 * 3600.0
+
 _SOLUTION_TYPE_MAP = {
     SolutionType.Invalid: SolutionTypeInfo(name='Invalid', style={'color': 'black'}),
     SolutionType.Integrate: SolutionTypeInfo(name='Integrated', style={'color': 'cyan'}),
@@ -43,26 +61,135 @@ _SOLUTION_TYPE_MAP = {
     SolutionType.Visual: SolutionTypeInfo(name='Vision', style={'color': 'purple'}),
 }
 
+# Lookup table mapping calibration stage enum values onto a [0, N) range for plotting.
+_CALIBRATION_STAGE_LUT = np.full(max(e.value for e in CalibrationStage) + 1, -1, dtype=int)
+_CALIBRATION_STAGE_LUT[[e.value for e in CalibrationStage]] = np.arange(len(CalibrationStage))
+
+_TIME_SOURCE_DISPLAY_NAME = {
+    SystemTimeSource.P1_TIME: 'P1',
+    SystemTimeSource.GPS_TIME: 'GPS',
+    SystemTimeSource.SENDER_SYSTEM_TIME: 'External',
+    SystemTimeSource.TIMESTAMPED_ON_RECEPTION: 'System',
+}
+
+# The Analyzer attribute containing t0 for each time source, or None if the source's timestamps are used as-is.
+_T0_ATTR_BY_TIME_SOURCE = {
+    SystemTimeSource.P1_TIME: 't0',
+    SystemTimeSource.GPS_TIME: None,
+    SystemTimeSource.SENDER_SYSTEM_TIME: None,
+    SystemTimeSource.TIMESTAMPED_ON_RECEPTION: 'system_t0',
+}
+
+# Time range specified on the command line: `[START][:END]`.
+_TIME_RANGE_RE = re.compile(r'^(?P<start>[^:]*)(?::(?P<end>[^:]*))?$')
+
+# Plotly hover templates. Plot functions pass the raw hover values to Plotly in `customdata` and let the browser format
+# the hover text using these templates, rather than formatting a hover string for every point in Python.
+_TIME_HOVER_TEMPLATE = 'Time: %{x:.3f} sec (%{customdata:.3f} sec)<br>%{y}'
+
+_MAP_HOVER_TEMPLATE = \
+    'Time: %{customdata[0]:.3f} sec (%{customdata[1]:.3f} sec)' \
+    '<br>Std (ENU): (%{customdata[2]:.2f}, %{customdata[3]:.2f}, %{customdata[4]:.2f}) m'
+
+_DISPLACEMENT_HOVER_TEMPLATE = \
+    'Time: %{customdata[0]:.3f} sec (%{customdata[1]:.3f} sec)' \
+    '<br>Delta (ENU): (%{customdata[2]:.2f}, %{customdata[3]:.2f}, %{customdata[4]:.2f}) m' \
+    '<br>Std (ENU): (%{customdata[5]:.2f}, %{customdata[6]:.2f}, %{customdata[7]:.2f}) m'
+
+
+def _f32(a):
+    # Plotted values do not need more than single precision for display, and float32 arrays are half the size to store
+    # and send to the browser. Note that this should not be used for time axes: relative times lose millisecond
+    # resolution in float32 after a few hours.
+    return np.ascontiguousarray(a, dtype=np.float32)
+
+
+def _describe(values):
+    # Partition the data once to find the min, median, and max together, rather than searching for each separately
+    # (np.median() would partition a copy of the data on its own anyway).
+    num_values = len(values)
+    lower_mid_idx = (num_values - 1) // 2
+    upper_mid_idx = num_values // 2
+    partitioned = np.partition(values, (0, lower_mid_idx, upper_mid_idx, num_values - 1))
+
+    # np.partition() sorts NaN values to the end, so the partitioned min, median, and max would be incorrect. If there
+    # are any NaN values, report all statistics as NaN, the same as the individual NumPy reductions.
+    if np.isnan(partitioned[-1]):
+        return {'mean': np.nan, 'median': np.nan, 'min': np.nan, 'max': np.nan, 'std': np.nan}
+
+    mean = np.mean(values)
+    residuals = values - mean
+    return {
+        'mean': mean,
+        'median': 0.5 * (partitioned[lower_mid_idx] + partitioned[upper_mid_idx]),
+        'min': partitioned[0],
+        'max': partitioned[-1],
+        'std': np.sqrt(np.dot(residuals, residuals) / num_values),
+    }
+
+
+def _get_valid_solutions(time, solution_type):
+    # Find entries with a valid solution type and P1 time (NaN != NaN, so the time comparison is false for NaN times).
+    # Combine the two conditions in place rather than allocating separate arrays for ~isnan() and the final result.
+    valid_idx = np.equal(time, time)
+    valid_idx &= solution_type != SolutionType.Invalid
+    return valid_idx
+
+
+def _all_nan(values):
+    # Check a short prefix first: in the common case it contains a valid value, and we can skip building a mask for the
+    # full array.
+    return bool(np.isnan(values[:1024]).all()) and bool(np.isnan(values).all())
+
+
+def _has_multiple_values(values):
+    # A single min/max reduction, rather than allocating np.diff() and comparison temporaries.
+    return len(values) > 1 and values.min() != values.max()
+
+
+def _decimate_lla(lla_deg, min_separation_m):
+    # Snap each position to a grid with the specified spacing, and drop consecutive points that fall within the same
+    # grid cell. Later visits to the same location are kept, so the result is still the trajectory in time order. We use
+    # a local flat-earth approximation to convert to meters, which is plenty accurate for this purpose.
+    lat_rad = np.deg2rad(lla_deg[0, :])
+    lon_rad = np.deg2rad(lla_deg[1, :])
+    meters_per_rad = 6378137.0
+    north_cell = np.floor(lat_rad * (meters_per_rad / min_separation_m)).astype(np.int64)
+    east_cell = np.floor(lon_rad * (meters_per_rad * np.cos(lat_rad[0]) / min_separation_m)).astype(np.int64)
+
+    # Keep the first point, and each point whose grid cell differs from the point before it. Every dropped point is in
+    # the same cell as the previous kept point.
+    keep = np.empty(len(north_cell), dtype=bool)
+    keep[:1] = True
+    keep[1:] = (north_cell[1:] != north_cell[:-1]) | (east_cell[1:] != east_cell[:-1])
+    return np.flatnonzero(keep)
+
+
+def _add_xyz_traces(figure, row, col, time, values, names, legendgroups, showlegend=True, **kwargs):
+    # Plot each row of a 3xN array (e.g., X/Y/Z, E/N/U, or yaw/pitch/roll) as a line in red, green, and blue
+    # respectively.
+    #
+    # The message to_numpy() functions typically return transposed arrays, so the rows are strided views into the data.
+    # Convert to a row-major (C-contiguous) array first so each row passed to Plotly is contiguous.
+    values = _f32(values)
+    traces = [go.Scattergl(x=time, y=values[i, :], name=name, legendgroup=legendgroup, showlegend=showlegend,
+                           mode='lines', line={'color': color}, **kwargs)
+              for i, (name, legendgroup, color) in enumerate(zip(names, legendgroups, ('red', 'green', 'blue')))]
+    figure.add_traces(traces, rows=[row] * len(traces), cols=[col] * len(traces))
+
 
 def _data_to_table(col_titles: List[str], col_values: List[List[Any]]):
-    table_html = '<table><tr style="background-color: #a2c4fa">'
-    for title in col_titles:
-        table_html += f'<th>{title}</th>'
-    table_html += '</tr>'
-    num_rows = min([len(l) for l in col_values])
-    for row_idx in range(num_rows):
-        table_html += '<tr>'
-
-        separator_row = col_values[0][row_idx] is None
-        for col_data in col_values:
-            if separator_row:
-                table_html += '<td><hr></td>'
-            else:
-                table_html += f'<td>{col_data[row_idx]}</td>'
+    header_html = '<tr style="background-color: #a2c4fa">' + ''.join(f'<th>{title}</th>' for title in col_titles) + \
+                  '</tr>'
+
+    # Build each row separately and join them once at the end. Repeated string concatenation is O(N^2) for large
+    # tables (e.g., the event log). Each row is formatted with a single precomputed format string, and zip() stops at
+    # the shortest column.
+    separator_html = '<tr>' + '<td><hr></td>' * len(col_values) + '</tr>'
+    row_format = '<tr>' + '<td>{}</td>' * len(col_values) + '</tr>'
+    rows_html = [separator_html if row[0] is None else row_format.format(*row) for row in zip(*col_values)]
 
-        table_html += '</tr>'
-    table_html += '</table>'
-    return table_html
+    return '<table>' + header_html + ''.join(rows_html) + '</table>'
 
 
 _page_template = '''\
@@ -78,6 +205,60 @@ _page_template = '''\
 </html>
 '''
 
+# Memoized message type name lookup, keyed by integer message type.
+_get_type_string = functools.lru_cache(maxsize=None)(MessageType.get_type_string)
+
+# The page template split around the body, so large page bodies can be written in pieces instead of being copied into
+# one formatted string.
+_page_header, _page_footer = _page_template.split('%(body)s')
+
+# Output buffer size used when writing generated pages.
+_PAGE_WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def _write_page(path, title, body_parts):
+    with open(path, 'w', buffering=_PAGE_WRITE_BUFFER_SIZE) as fd:
+        fd.write(_page_header % {'title': title})
+        for part in body_parts:
+            fd.write(part)
+        fd.write(_page_footer)
+
+
+# Page used to display a single figure. The figure data is stored in a separate script, loaded asynchronously after the
+# page itself has rendered. A <script> tag is used rather than fetch(), which browsers block for file:// URLs.
+_figure_page_template = '''\
+<!DOCTYPE html>
+<html style="height: 100%%;">
+<head>
+  <meta charset="utf-8">
+  <title>%(title)s</title>
+  <script src="%(plotlyjs_url)s"></script>
+</head>
+<body style="height: 100%%; margin: 0;">
+  <div id="figure" style="height: 100%%; width: 100%%;"></div>
+  <script src="%(data_url)s" async></script>
+</body>
+</html>
+'''
+
+_figure_data_template = '''\
+var figure = %(figure_json)s;
+Plotly.newPlot("figure", figure.data, figure.layout, {"responsive": true});
+'''
+
+# The analyzer used by Analyzer.run_plots() worker processes. Set in the parent process before the workers are forked.
+_worker_analyzer = None
+
+
+def _run_plot(name, kwargs):
+    # Only return the plots generated by this worker, not ones inherited from the parent process.
+    analyzer = _worker_analyzer
+    analyzer.plots = {}
+    analyzer._plot_titles = []
+    analyzer._mapbox_token_missing = False
+    getattr(analyzer, name)(**kwargs)
+    return analyzer.plots, analyzer._mapbox_token_missing
+
 
 class Analyzer(object):
     logger = _logger
@@ -86,7 +267,8 @@ class Analyzer(object):
                  prefix: str = '',
                  time_range: Tuple[Union[float, Timestamp], Union[float, Timestamp]] = None,
                  absolute_time: bool = False,
-                 max_messages: int = None):
+                 max_messages: int = None,
+                 embed_plotlyjs: bool = False):
         """!
         @brief Create an analyzer for the specified log.
 
@@ -101,6 +283,9 @@ class Analyzer(object):
                them as relative to the first message in the file.
         @param max_messages If set, read up to the specified maximum number of messages. Applies across all message
                types.
+        @param embed_plotlyjs If `True`, store a single local copy of plotly.js in `output_dir` and reference it from
+               each generated figure so the output can be viewed offline. Otherwise, load plotly.js from the CDN, in
+               which case viewing the generated figures requires network access.
         """
         if isinstance(file, str):
             self.reader = FileReader(file, regenerate_index=ignore_index)
@@ -109,6 +294,7 @@ class Analyzer(object):
 
         self.output_dir = output_dir
         self.prefix = prefix
+        self.embed_plotlyjs = embed_plotlyjs
 
         self.params = {
             'time_range': time_range if time_range is not None else (None, None),
@@ -122,6 +308,8 @@ class Analyzer(object):
         self.system_t0 = self.reader.get_system_t0()
 
         self.plots = {}
+        # (title, name) for each entry in self.plots, kept sorted by title for generate_index().
+        self._plot_titles = []
         self.summary = ''
 
         self._mapbox_token_missing = False
@@ -130,6 +318,11 @@ class Analyzer(object):
             if not os.path.exists(self.output_dir):
                 os.makedirs(self.output_dir)
 
+            # Write plotly.js once up front. Each figure links to this copy rather than embedding its own.
+            if self.embed_plotlyjs:
+                with open(os.path.join(self.output_dir, 'plotly.min.js'), 'w', encoding='utf-8') as fd:
+                    fd.write(plotly.offline.get_plotlyjs())
+
     def plot_time_scale(self):
         if self.output_dir is None:
             return
@@ -151,22 +344,31 @@ class Analyzer(object):
         pose_data = result[PoseMessage.MESSAGE_TYPE]
 
         if len(pose_data.p1_time) > 0:
-            time = pose_data.p1_time - float(self.t0)
-
-            dp1_time = np.diff(time, prepend=np.nan)
-            dp1_time = np.round(dp1_time * 1e3) * 1e-3
+            t0 = float(self.t0)
+            time = pose_data.p1_time - t0
+
+            # Compute the time deltas (rounded to the nearest millisecond) in place in a single output array, rather
+            # than allocating a new temporary array for each step.
+            dp1_time = np.empty_like(time)
+            dp1_time[0] = np.nan
+            np.subtract(time[1:], time[:-1], out=dp1_time[1:])
+            np.multiply(dp1_time, 1e3, out=dp1_time)
+            np.round(dp1_time, out=dp1_time)
+            np.multiply(dp1_time, 1e-3, out=dp1_time)
 
             # plotly starts to struggle with > 2 hours of data and won't display mouseover text, so decimate if
             # necessary.
             dt_sec = time[-1] - time[0]
             if dt_sec > 7200.0:
                 step = math.ceil(dt_sec / 7200.0)
-                idx = np.full_like(time, False, dtype=bool)
-                idx[0::step] = True
+                # Use a strided slice rather than a boolean mask so NumPy returns views instead of copies.
+                idx = slice(0, None, step)
 
-                time = time[idx]
+                # The plotted values are copied into contiguous arrays for Plotly. The others are only used to
+                # generate hover text.
+                time = np.ascontiguousarray(time[idx])
                 p1_time = pose_data.p1_time[idx]
-                dp1_time = dp1_time[idx]
+                dp1_time = np.ascontiguousarray(dp1_time[idx])
                 gps_time = pose_data.gps_time[idx]
 
                 figure.layout.annotations[0].text += "<br>Decimated %dx" % step
@@ -174,18 +376,21 @@ class Analyzer(object):
                 p1_time = pose_data.p1_time
                 gps_time = pose_data.gps_time
 
-            def gps_sec_to_string(gps_time_sec):
+            # Split the GPS times into week number and time of week for all (decimated) points at once. Only the UTC
+            # conversion and string formatting are done per point.
+            gps_week = np.floor(gps_time / SECS_PER_WEEK)
+            gps_tow_sec = gps_time - gps_week * SECS_PER_WEEK
+
+            def gps_sec_to_string(gps_time_sec, week, tow_sec):
                 if np.isnan(gps_time_sec):
                     return "GPS: N/A<br>UTC: N/A"
                 else:
-                    SECS_PER_WEEK = 7 * 24 * 3600.0
-                    week = int(gps_time_sec / SECS_PER_WEEK)
-                    tow_sec = gps_time_sec - week * SECS_PER_WEEK
                     utc_time = gpstime.fromgps(gps_time_sec)
                     return "GPS: %d:%.3f (%.3f sec)<br>UTC: %s" %\
                            (week, tow_sec, gps_time_sec, utc_time.strftime('%Y-%m-%d %H:%M:%S %Z'))
 
-            text = ['P1: %.3f sec<br>%s' % (p, gps_sec_to_string(g)) for p, g in zip(p1_time, gps_time)]
+            text = ['P1: %.3f sec<br>%s' % (p, gps_sec_to_string(g, w, tow))
+                    for p, g, w, tow in zip(p1_time, gps_time, gps_week, gps_tow_sec)]
             figure.add_trace(go.Scattergl(x=time, y=np.full_like(time, 1), name='P1/GPS Time', text=text,
                                           mode='markers'),
                              1, 1)
@@ -199,8 +404,8 @@ class Analyzer(object):
         event_data = result[EventNotificationMessage.MESSAGE_TYPE]
 
         system_time_sec = None
-        if len(event_data.messages) > 0:
-            system_time_sec = np.array([(m.system_time_ns * 1e-9) for m in event_data.messages])
+        if len(event_data.system_time_ns) > 0:
+            system_time_sec = event_data.system_time_ns.astype(np.float64) * 1e-9
 
         if system_time_sec is not None:
             time = system_time_sec - self.system_t0
@@ -210,10 +415,9 @@ class Analyzer(object):
             dt_sec = time[-1] - time[0]
             if dt_sec > 7200.0:
                 step = math.ceil(dt_sec / 7200.0)
-                idx = np.full_like(time, False, dtype=bool)
-                idx[0::step] = True
+                idx = slice(0, None, step)
 
-                time = time[idx]
+                time = np.ascontiguousarray(time[idx])
                 system_time_sec = system_time_sec[idx]
 
             text = ['System: %.3f sec' % t for t in system_time_sec]
@@ -238,14 +442,17 @@ class Analyzer(object):
             self.logger.info('No pose data available. Skipping pose vs time plot.')
             return
 
-        time = pose_data.p1_time - float(self.t0)
+        t0 = float(self.t0)
+        time = pose_data.p1_time - t0
 
-        valid_idx = np.logical_and(~np.isnan(pose_data.p1_time), pose_data.solution_type != SolutionType.Invalid)
-        if not np.any(valid_idx):
+        valid_idx = _get_valid_solutions(pose_data.p1_time, pose_data.solution_type)
+        # argmax() returns the first valid entry, or 0 if there are none, so we can check for valid data and find the
+        # first valid solution in one pass.
+        first_idx = np.argmax(valid_idx)
+        if not valid_idx[first_idx]:
             self.logger.info('No valid position solutions detected.')
             return
 
-        first_idx = np.argmax(valid_idx)
         c_enu_ecef = get_enu_rotation_matrix(*pose_data.lla_deg[0:2, first_idx], deg=True)
 
         # Setup the figure.
@@ -264,72 +471,26 @@ class Analyzer(object):
         figure['layout']['yaxis6'].update(title="Meters/Second")
 
         # Plot YPR.
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.ypr_deg[0, :], name='Yaw', legendgroup='yaw',
-                                      mode='lines', line={'color': 'red'}),
-                         1, 1)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.ypr_deg[1, :], name='Pitch', legendgroup='pitch',
-                                      mode='lines', line={'color': 'green'}),
-                         1, 1)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.ypr_deg[2, :], name='Roll', legendgroup='roll',
-                                      mode='lines', line={'color': 'blue'}),
-                         1, 1)
-
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.ypr_std_deg[0, :], name='Yaw', legendgroup='yaw',
-                                      showlegend=False, mode='lines', line={'color': 'red'}),
-                         2, 1)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.ypr_std_deg[1, :], name='Pitch', legendgroup='pitch',
-                                      showlegend=False, mode='lines', line={'color': 'green'}),
-                         2, 1)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.ypr_std_deg[2, :], name='Roll', legendgroup='roll',
-                                      showlegend=False, mode='lines', line={'color': 'blue'}),
-                         2, 1)
+        _add_xyz_traces(figure, 1, 1, time, pose_data.ypr_deg, names=('Yaw', 'Pitch', 'Roll'),
+                        legendgroups=('yaw', 'pitch', 'roll'))
+        _add_xyz_traces(figure, 2, 1, time, pose_data.ypr_std_deg, names=('Yaw', 'Pitch', 'Roll'),
+                        legendgroups=('yaw', 'pitch', 'roll'), showlegend=False)
 
         # Plot position/displacement.
-        position_ecef_m = np.array(geodetic2ecef(lat=pose_data.lla_deg[0, :], lon=pose_data.lla_deg[1, :],
-                                                 alt=pose_data.lla_deg[0, :], deg=True))
+        position_ecef_m = geodetic_to_ecef(latitude=pose_data.lla_deg[0, :], longitude=pose_data.lla_deg[1, :],
+                                           altitude=pose_data.lla_deg[2, :], deg=True)
         displacement_ecef_m = position_ecef_m - position_ecef_m[:, first_idx].reshape(3, 1)
         displacement_enu_m = c_enu_ecef.dot(displacement_ecef_m)
-        figure.add_trace(go.Scattergl(x=time, y=displacement_enu_m[0, :], name='East', legendgroup='e',
-                                      mode='lines', line={'color': 'red'}),
-                         1, 2)
-        figure.add_trace(go.Scattergl(x=time, y=displacement_enu_m[1, :], name='North', legendgroup='n',
-                                      mode='lines', line={'color': 'green'}),
-                         1, 2)
-        figure.add_trace(go.Scattergl(x=time, y=displacement_enu_m[2, :], name='Up', legendgroup='u',
-                                      mode='lines', line={'color': 'blue'}),
-                         1, 2)
-
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.position_std_enu_m[0, :], name='East', legendgroup='e',
-                                      showlegend=False, mode='lines', line={'color': 'red'}),
-                         2, 2)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.position_std_enu_m[1, :], name='North', legendgroup='n',
-                                      showlegend=False, mode='lines', line={'color': 'green'}),
-                         2, 2)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.position_std_enu_m[2, :], name='Up', legendgroup='u',
-                                      showlegend=False, mode='lines', line={'color': 'blue'}),
-                         2, 2)
+        _add_xyz_traces(figure, 1, 2, time, displacement_enu_m, names=('East', 'North', 'Up'),
+                        legendgroups=('e', 'n', 'u'))
+        _add_xyz_traces(figure, 2, 2, time, pose_data.position_std_enu_m, names=('East', 'North', 'Up'),
+                        legendgroups=('e', 'n', 'u'), showlegend=False)
 
         # Plot velocity.
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.velocity_body_mps[0, :], name='X', legendgroup='x',
-                                      mode='lines', line={'color': 'red'}),
-                         1, 3)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.velocity_body_mps[1, :], name='Y', legendgroup='y',
-                                      mode='lines', line={'color': 'green'}),
-                         1, 3)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.velocity_body_mps[2, :], name='Z', legendgroup='z',
-                                      mode='lines', line={'color': 'blue'}),
-                         1, 3)
-
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.velocity_std_body_mps[0, :], name='X', legendgroup='x',
-                                      showlegend=False, mode='lines', line={'color': 'red'}),
-                         2, 3)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.velocity_std_body_mps[1, :], name='Y', legendgroup='y',
-                                      showlegend=False, mode='lines', line={'color': 'green'}),
-                         2, 3)
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.velocity_std_body_mps[2, :], name='Z', legendgroup='z',
-                                      showlegend=False, mode='lines', line={'color': 'blue'}),
-                         2, 3)
-
+        _add_xyz_traces(figure, 1, 3, time, pose_data.velocity_body_mps, names=('X', 'Y', 'Z'),
+                        legendgroups=('x', 'y', 'z'))
+        _add_xyz_traces(figure, 2, 3, time, pose_data.velocity_std_body_mps, names=('X', 'Y', 'Z'),
+                        legendgroups=('x', 'y', 'z'), showlegend=False)
         self._add_figure(name="pose", figure=figure, title="Vehicle Pose vs. Time")
 
     def plot_calibration(self):
@@ -347,12 +508,13 @@ class Analyzer(object):
             self.logger.info('No calibration data available. Skipping calibration plot.')
             return
 
-        time = cal_data.p1_time - float(self.t0)
-        text = ["Time: %.3f sec (%.3f sec)" % (t, t + float(self.t0)) for t in time]
+        t0 = float(self.t0)
+        time = cal_data.p1_time - t0
+
+        hover = {'customdata': cal_data.p1_time, 'hovertemplate': _TIME_HOVER_TEMPLATE}
 
         # Map calibration stage enum values onto a [0, N) range for plotting.
-        stage_map = {e.value: i for i, e in enumerate(CalibrationStage)}
-        calibration_stage = [stage_map[s] for s in cal_data.calibration_stage]
+        calibration_stage = _CALIBRATION_STAGE_LUT[cal_data.calibration_stage]
 
         # Setup the figure.
         figure = make_subplots(rows=4, cols=1, print_grid=False, shared_xaxes=True,
@@ -365,47 +527,31 @@ class Analyzer(object):
             figure['layout']['xaxis%d' % (i + 1)].update(title="Time (sec)", showticklabels=True)
         figure['layout']['yaxis1'].update(title="Percent Complete", range=[0, 100])
         figure['layout']['yaxis2'].update(ticktext=['%s' % e.name for e in CalibrationStage],
-                                          tickvals=list(range(len(stage_map))))
+                                          tickvals=list(range(len(CalibrationStage))))
         figure['layout']['yaxis3'].update(title="Degrees")
         figure['layout']['yaxis4'].update(title="Degrees")
         figure['layout']['yaxis5'].update(title="Meters")
 
         # Plot calibration stage and completion percentages.
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.gyro_bias_percent_complete, name='Gyro Bias Completion',
-                                      text=text, mode='lines', line={'color': 'red'}),
+        figure.add_trace(go.Scattergl(x=time, y=_f32(cal_data.gyro_bias_percent_complete),
+                                      name='Gyro Bias Completion', mode='lines', line={'color': 'red'}, **hover),
                          1, 1)
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.accel_bias_percent_complete, name='Accel Bias Completion',
-                                      text=text, mode='lines', line={'color': 'green'}),
+        figure.add_trace(go.Scattergl(x=time, y=_f32(cal_data.accel_bias_percent_complete),
+                                      name='Accel Bias Completion', mode='lines', line={'color': 'green'}, **hover),
                          1, 1)
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.mounting_angle_percent_complete,
-                                      name='Mounting Angle Completion', text=text,
-                                      mode='lines', line={'color': 'blue'}),
+        figure.add_trace(go.Scattergl(x=time, y=_f32(cal_data.mounting_angle_percent_complete),
+                                      name='Mounting Angle Completion', mode='lines', line={'color': 'blue'}, **hover),
                          1, 1)
 
-        figure.add_trace(go.Scattergl(x=time, y=calibration_stage, name='Stage', text=text,
-                                      mode='lines', line={'color': 'black', 'dash': 'dash'}),
+        figure.add_trace(go.Scattergl(x=time, y=calibration_stage, name='Stage',
+                                      mode='lines', line={'color': 'black', 'dash': 'dash'}, **hover),
                          1, 1, secondary_y=True)
 
         # Plot mounting angles.
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.ypr_deg[0, :], name='Yaw', legendgroup='y', text=text,
-                                      mode='lines', line={'color': 'red'}),
-                         2, 1)
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.ypr_deg[1, :], name='Pitch', legendgroup='p', text=text,
-                                      mode='lines', line={'color': 'green'}),
-                         2, 1)
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.ypr_deg[2, :], name='Roll', legendgroup='r', text=text,
-                                      mode='lines', line={'color': 'blue'}),
-                         2, 1)
-
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.ypr_std_dev_deg[0, :], name='Yaw Std Dev', legendgroup='y',
-                                      text=text, mode='lines', line={'color': 'red'}),
-                         3, 1)
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.ypr_std_dev_deg[1, :], name='Pitch Std Dev', legendgroup='p',
-                                      text=text, mode='lines', line={'color': 'green'}),
-                         3, 1)
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.ypr_std_dev_deg[2, :], name='Roll Std Dev', legendgroup='r',
-                                      text=text, mode='lines', line={'color': 'blue'}),
-                         3, 1)
+        _add_xyz_traces(figure, 2, 1, time, cal_data.ypr_deg, names=('Yaw', 'Pitch', 'Roll'),
+                        legendgroups=('y', 'p', 'r'), **hover)
+        _add_xyz_traces(figure, 3, 1, time, cal_data.ypr_std_dev_deg,
+                        names=('Yaw Std Dev', 'Pitch Std Dev', 'Roll Std Dev'), legendgroups=('y', 'p', 'r'), **hover)
 
         thresh_time = time[np.array((0, -1))]
         figure.add_trace(go.Scattergl(x=thresh_time, y=[cal_data.mounting_angle_max_std_dev_deg[0]] * 2,
@@ -414,19 +560,19 @@ class Analyzer(object):
                          3, 1)
         figure.add_trace(go.Scattergl(x=thresh_time, y=[cal_data.mounting_angle_max_std_dev_deg[1]] * 2,
                                       name='Max Pitch Std Dev', legendgroup='p',
-                                      text=text, mode='lines', line={'color': 'green', 'dash': 'dash'}),
+                                      mode='lines', line={'color': 'green', 'dash': 'dash'}),
                          3, 1)
         figure.add_trace(go.Scattergl(x=thresh_time, y=[cal_data.mounting_angle_max_std_dev_deg[2]] * 2,
                                       name='Max Roll Std Dev', legendgroup='r',
-                                      text=text, mode='lines', line={'color': 'blue', 'dash': 'dash'}),
+                                      mode='lines', line={'color': 'blue', 'dash': 'dash'}),
                          3, 1)
 
         # Plot travel distance.
-        figure.add_trace(go.Scattergl(x=time, y=cal_data.travel_distance_m, name='Travel Distance', text=text,
-                                      mode='lines', line={'color': 'blue'}),
+        figure.add_trace(go.Scattergl(x=time, y=_f32(cal_data.travel_distance_m), name='Travel Distance',
+                                      mode='lines', line={'color': 'blue'}, **hover),
                          4, 1)
         figure.add_trace(go.Scattergl(x=thresh_time, y=[cal_data.min_travel_distance_m] * 2,
-                                      name='Min Travel Distance', text=text,
+                                      name='Min Travel Distance',
                                       mode='lines', line={'color': 'black', 'dash': 'dash'}),
                          4, 1)
 
@@ -455,10 +601,11 @@ class Analyzer(object):
                                           ticktext=['%s (%d)' % (e.name, e.value) for e in SolutionType],
                                           tickvals=[e.value for e in SolutionType])
 
-        time = pose_data.p1_time - float(self.t0)
+        t0 = float(self.t0)
+        time = pose_data.p1_time - t0
 
-        text = ["Time: %.3f sec (%.3f sec)" % (t, t + float(self.t0)) for t in time]
-        figure.add_trace(go.Scattergl(x=time, y=pose_data.solution_type, text=text, mode='markers'), 1, 1)
+        figure.add_trace(go.Scattergl(x=time, y=pose_data.solution_type, customdata=pose_data.p1_time,
+                                      hovertemplate=_TIME_HOVER_TEMPLATE, mode='markers'), 1, 1)
 
         self._add_figure(name="solution_type", figure=figure, title="Solution Type")
 
@@ -470,6 +617,8 @@ class Analyzer(object):
         if self.output_dir is None:
             return
 
+        t0 = float(self.t0)
+
         # Setup the figure.
         topo_figure = make_subplots(rows=1, cols=1, print_grid=False, shared_xaxes=False,
                                     subplot_titles=['Displacement'])
@@ -487,68 +636,69 @@ class Analyzer(object):
         time_figure['layout']['yaxis4'].update(title="Displacement (m)")
 
         # Remove invalid solutions.
-        valid_idx = np.logical_and(~np.isnan(time), solution_type != SolutionType.Invalid)
+        valid_idx = _get_valid_solutions(time, solution_type)
         if not np.any(valid_idx):
             self.logger.info('No valid position solutions detected. Skipping displacement plots.')
             return
 
         # Add statistics to the figure title.
         format = 'Mean: %(mean).2f m, Median: %(median).2f m, Min: %(min).2f m, Max: %(max).2f m, Std Dev: %(std).2f m'
-        displacement_3d_m = np.linalg.norm(displacement_enu_m, axis=0)
-        extra_text = '[All] ' + format % {
-            'mean': np.mean(displacement_3d_m),
-            'median': np.median(displacement_3d_m),
-            'min': np.min(displacement_3d_m),
-            'max': np.max(displacement_3d_m),
-            'std': np.std(displacement_3d_m),
-        }
+        # Compute the 3D displacement magnitudes once and reuse them for the statistics and plots below.
+        displacement_3d_m = np.sqrt(np.einsum('ij,ij->j', displacement_enu_m, displacement_enu_m))
+        extra_text = '[All] ' + format % _describe(displacement_3d_m)
 
-        idx = solution_type == SolutionType.RTKFixed
-        if np.any(idx):
-            displacement_3d_m = np.linalg.norm(displacement_enu_m[:, idx], axis=0)
-            extra_text += '<br>[Fixed] ' + format % {
-                'mean': np.mean(displacement_3d_m),
-                'median': np.median(displacement_3d_m),
-                'min': np.min(displacement_3d_m),
-                'max': np.max(displacement_3d_m),
-                'std': np.std(displacement_3d_m),
-            }
+        # Group the solutions by type in a single pass, rather than comparing the full solution type array against
+        # each type separately.
+        sort_idx = np.argsort(solution_type, kind='stable')
+        types, start_idx = np.unique(solution_type[sort_idx], return_index=True)
+        idx_by_type = dict(zip(types.tolist(), np.split(sort_idx, start_idx[1:])))
+        no_idx = np.array([], dtype=int)
+
+        idx = idx_by_type.get(SolutionType.RTKFixed, no_idx)
+        if len(idx) > 0:
+            extra_text += '<br>[Fixed] ' + format % _describe(displacement_3d_m[idx])
 
         topo_figure.update_layout(title_text=extra_text)
         time_figure.update_layout(title_text=extra_text)
 
         # Plot the data.
+        #
+        # Collect the traces for all solution types and add them to the figures at the end. Adding them all in one call
+        # is much faster than calling add_trace() for each one.
+        topo_traces = []
+        time_traces = []
+        time_rows = []
+
         def _plot_data(name, idx, marker_style=None):
             style = {'mode': 'markers', 'marker': {'size': 8}, 'showlegend': True, 'legendgroup': name}
             if marker_style is not None:
                 style['marker'].update(marker_style)
 
-            if np.any(idx):
-                text = ["Time: %.3f sec (%.3f sec)<br>Delta (ENU): (%.2f, %.2f, %.2f) m" \
-                        "<br>Std (ENU): (%.2f, %.2f, %.2f) m" %
-                        (t, t + float(self.t0), *delta, *std)
-                        for t, delta, std in zip(time[idx], displacement_enu_m[:, idx].T, std_enu_m[:, idx].T)]
-                topo_figure.add_trace(go.Scattergl(x=displacement_enu_m[0, idx], y=displacement_enu_m[1, idx],
-                                                   name=name, text=text, **style), 1, 1)
-
-                time_figure.add_trace(go.Scattergl(x=time[idx], y=np.linalg.norm(displacement_enu_m[:, idx], axis=0),
-                                                   name=name, text=text, **style), 1, 1)
+            if len(idx) > 0:
+                style['customdata'] = np.vstack((time[idx], time[idx] + t0,
+                                                 displacement_enu_m[:, idx], std_enu_m[:, idx])).T
+                style['hovertemplate'] = _DISPLACEMENT_HOVER_TEMPLATE
+                time_idx = time[idx]
+                displacement_f32 = _f32(displacement_enu_m[:, idx])
+                topo_traces.append(go.Scattergl(x=displacement_f32[0], y=displacement_f32[1], name=name, **style))
+
+                time_traces.append(go.Scattergl(x=time_idx, y=_f32(displacement_3d_m[idx]), name=name, **style))
                 style['showlegend'] = False
-                time_figure.add_trace(go.Scattergl(x=time[idx], y=displacement_enu_m[0, idx], name=name,
-                                                   text=text, **style), 2, 1)
-                time_figure.add_trace(go.Scattergl(x=time[idx], y=displacement_enu_m[1, idx], name=name,
-                                                   text=text, **style), 3, 1)
-                time_figure.add_trace(go.Scattergl(x=time[idx], y=displacement_enu_m[2, idx], name=name,
-                                                   text=text, **style), 4, 1)
+                time_traces.append(go.Scattergl(x=time_idx, y=displacement_f32[0], name=name, **style))
+                time_traces.append(go.Scattergl(x=time_idx, y=displacement_f32[1], name=name, **style))
+                time_traces.append(go.Scattergl(x=time_idx, y=displacement_f32[2], name=name, **style))
+                time_rows.extend((1, 2, 3, 4))
             else:
                 # If there's no data, draw a dummy trace so it shows up in the legend anyway.
-                topo_figure.add_trace(go.Scattergl(x=[np.nan], y=[np.nan], name=name, visible='legendonly', **style),
-                                      1, 1)
-                time_figure.add_trace(go.Scattergl(x=[np.nan], y=[np.nan], name=name, visible='legendonly', **style),
-                                      1, 1)
+                topo_traces.append(go.Scattergl(x=[np.nan], y=[np.nan], name=name, visible='legendonly', **style))
+                time_traces.append(go.Scattergl(x=[np.nan], y=[np.nan], name=name, visible='legendonly', **style))
+                time_rows.append(1)
 
         for type, info in _SOLUTION_TYPE_MAP.items():
-            _plot_data(info.name, solution_type == type, marker_style=info.style)
+            _plot_data(info.name, idx_by_type.get(type, no_idx), marker_style=info.style)
+
+        topo_figure.add_traces(topo_traces, rows=[1] * len(topo_traces), cols=[1] * len(topo_traces))
+        time_figure.add_traces(time_traces, rows=time_rows, cols=[1] * len(time_rows))
 
         name = source.replace(' ', '_').lower()
         self._add_figure(name=f"{name}_top_down", figure=topo_figure, title=f"{source}: Top-Down (Topocentric)")
@@ -571,19 +721,21 @@ class Analyzer(object):
             return
 
         # Remove invalid solutions.
-        valid_idx = np.logical_and(~np.isnan(pose_data.p1_time), pose_data.solution_type != SolutionType.Invalid)
+        valid_idx = _get_valid_solutions(pose_data.p1_time, pose_data.solution_type)
         if not np.any(valid_idx):
             self.logger.info('No valid position solutions detected. Skipping displacement plots.')
             return
 
-        time = pose_data.p1_time[valid_idx] - float(self.t0)
+        t0 = float(self.t0)
+        time = pose_data.p1_time[valid_idx] - t0
         solution_type = pose_data.solution_type[valid_idx]
         lla_deg = pose_data.lla_deg[:, valid_idx]
         std_enu_m = pose_data.position_std_enu_m[:, valid_idx]
 
         # Convert to ENU displacement with respect to the median position (we use median instead of centroid just in
         # case there are one or two huge outliers).
-        position_ecef_m = np.array(geodetic2ecef(lat=lla_deg[0, :], lon=lla_deg[1, :], alt=lla_deg[2, :], deg=True))
+        position_ecef_m = geodetic_to_ecef(latitude=lla_deg[0, :], longitude=lla_deg[1, :], altitude=lla_deg[2, :],
+                                           deg=True)
         center_ecef_m = np.median(position_ecef_m, axis=1)
         displacement_ecef_m = position_ecef_m - center_ecef_m.reshape(3, 1)
         c_enu_ecef = get_enu_rotation_matrix(*lla_deg[0:2, 0], deg=True)
@@ -607,23 +759,29 @@ class Analyzer(object):
             self.logger.info('No relative ENU data available. Skipping relative position vs base station plots.')
             return
 
-        # Remove invalid solutions.
-        valid_idx = ~np.isnan(relative_position_data.relative_position_enu_m[0, :])
+        # Remove invalid solutions. Convert the mask to indices once so each of the gathers below can reuse them.
+        valid_idx = np.flatnonzero(~np.isnan(relative_position_data.relative_position_enu_m[0, :]))
 
-        if not np.any(valid_idx):
+        if len(valid_idx) == 0:
             self.logger.info('No valid position solutions detected. Skipping relative position vs base station plots.')
             return
 
-        time = relative_position_data.p1_time[valid_idx] - float(self.t0)
+        t0 = float(self.t0)
+        time = relative_position_data.p1_time[valid_idx] - t0
         solution_type = relative_position_data.solution_type[valid_idx]
         displacement_enu_m = relative_position_data.relative_position_enu_m[:, valid_idx]
         std_enu_m = relative_position_data.position_std_enu_m[:, valid_idx]
 
         self._plot_displacement('Relative Position vs Base Station', time, solution_type, displacement_enu_m, std_enu_m)
 
-    def plot_map(self, mapbox_token):
+    def plot_map(self, mapbox_token, min_separation_m: float = 0.5):
         """!
         @brief Plot a map of the position data.
+
+        @param mapbox_token A Mapbox token to use for satellite imagery. See @ref get_mapbox_token().
+        @param min_separation_m If > 0, decimate the data so that consecutive points within the same grid cell of the
+               specified size (in meters) are drawn only once. This greatly reduces the size of the map for logs where
+               the device is stationary for long periods of time, without visibly changing the trajectory.
         """
         if self.output_dir is None:
             return
@@ -646,13 +804,14 @@ class Analyzer(object):
             self.logger.info('No pose data available. Skipping map display.')
             return
 
-        # Remove invalid solutions.
-        valid_idx = np.logical_and(~np.isnan(pose_data.p1_time), pose_data.solution_type != SolutionType.Invalid)
-        if not np.any(valid_idx):
+        # Remove invalid solutions. Convert the mask to indices once so each of the gathers below can reuse them.
+        valid_idx = np.flatnonzero(_get_valid_solutions(pose_data.p1_time, pose_data.solution_type))
+        if len(valid_idx) == 0:
             self.logger.info('No valid position solutions detected.')
             return
 
-        time = pose_data.p1_time[valid_idx] - float(self.t0)
+        t0 = float(self.t0)
+        time = pose_data.p1_time[valid_idx] - t0
         solution_type = pose_data.solution_type[valid_idx]
         lla_deg = pose_data.lla_deg[:, valid_idx]
         std_enu_m = pose_data.position_std_enu_m[:, valid_idx]
@@ -666,11 +825,13 @@ class Analyzer(object):
                 style['marker'].update(marker_style)
 
             if np.any(idx):
-                text = ["Time: %.3f sec (%.3f sec)<br>Std (ENU): (%.2f, %.2f, %.2f) m" %
-                        (t, t + float(self.t0), std[0], std[1], std[2])
-                        for t, std in zip(time[idx], std_enu_m[:, idx].T)]
-                map_data.append(go.Scattermapbox(lat=lla_deg[0, idx], lon=lla_deg[1, idx], name=name, text=text,
-                                                 **style))
+                idx = np.flatnonzero(idx)
+                if min_separation_m is not None and min_separation_m > 0.0:
+                    idx = idx[_decimate_lla(lla_deg[:, idx], min_separation_m)]
+
+                style['customdata'] = np.vstack((time[idx], time[idx] + t0, std_enu_m[:, idx])).T
+                style['hovertemplate'] = _MAP_HOVER_TEMPLATE
+                map_data.append(go.Scattermapbox(lat=lla_deg[0, idx], lon=lla_deg[1, idx], name=name, **style))
             else:
                 # If there's no data, draw a dummy trace so it shows up in the legend anyway.
                 map_data.append(go.Scattermapbox(lat=[np.nan], lon=[np.nan], name=name, visible='legendonly', **style))
@@ -770,8 +931,8 @@ class Analyzer(object):
         vehicle_time_source = None
 
         if wheel_data is not None:
-            if np.all(np.isnan(wheel_data.p1_time)):
-                if np.any(np.diff(wheel_data.measurement_time_source) != 0):
+            if _all_nan(wheel_data.p1_time):
+                if _has_multiple_values(wheel_data.measurement_time_source):
                     self.logger.warning('Detected multiple time source types in wheel %s data.' % type)
 
                 wheel_time_source = SystemTimeSource(wheel_data.measurement_time_source[0])
@@ -785,8 +946,8 @@ class Analyzer(object):
                                                            self._time_source_to_display_name(wheel_time_source))
 
         if vehicle_data is not None:
-            if np.all(np.isnan(vehicle_data.p1_time)):
-                if np.any(np.diff(vehicle_data.measurement_time_source) != 0):
+            if _all_nan(vehicle_data.p1_time):
+                if _has_multiple_values(vehicle_data.measurement_time_source):
                     self.logger.warning('Detected multiple time source types in vehicle %s data.' % type)
 
                 vehicle_time_source = SystemTimeSource(vehicle_data.measurement_time_source[0])
@@ -805,21 +966,22 @@ class Analyzer(object):
                                     'sources. Plotted data may not align in time.')
 
         # Plot the data.
-        def _plot_trace(time, data, name, color, text):
+        def _plot_trace(time, data, name, color, abs_time_sec, hovertemplate):
             if type == 'tick':
-                figure.add_trace(go.Scattergl(x=time, y=data, text=text,
+                figure.add_trace(go.Scattergl(x=time, y=data, customdata=abs_time_sec, hovertemplate=hovertemplate,
                                               name=name, legendgroup=name,
                                               mode='markers', marker={'color': color}),
                                  1, 1)
 
                 dt_sec = np.diff(time)
                 ticks_per_sec = np.diff(data) / dt_sec
-                figure.add_trace(go.Scattergl(x=time[1:], y=ticks_per_sec, text=text,
+                figure.add_trace(go.Scattergl(x=time[1:], y=ticks_per_sec, customdata=abs_time_sec[1:],
+                                              hovertemplate=hovertemplate,
                                               name=name, legendgroup=name, showlegend=False,
                                               mode='markers', marker={'color': color}),
                                  2, 1)
             else:
-                figure.add_trace(go.Scattergl(x=time, y=data, text=text,
+                figure.add_trace(go.Scattergl(x=time, y=data, customdata=abs_time_sec, hovertemplate=hovertemplate,
                                               name=name, legendgroup=name,
                                               mode='markers', marker={'color': color}),
                                  1, 1)
@@ -832,23 +994,26 @@ class Analyzer(object):
             t0 = self._get_t0_for_time_source(wheel_time_source)
             time = abs_time_sec - t0
             time_name = self._time_source_to_display_name(wheel_time_source)
-            text = ["%s Time: %.3f sec" % (time_name, t) for t in abs_time_sec]
+            hovertemplate = '(%{x}, %{y})<br>' + time_name + ' Time: %{customdata:.3f} sec'
 
             if type == 'tick':
                 suffix = 'wheel_ticks'
             else:
                 suffix = 'speed_mps'
 
-            _plot_trace(time=time, data=getattr(wheel_data, 'front_left_' + suffix)[idx], text=text,
-                        name='Front Left Wheel', color='red')
-            _plot_trace(time=time, data=getattr(wheel_data, 'front_right_' + suffix)[idx], text=text,
-                        name='Front Right Wheel', color='green')
-            _plot_trace(time=time, data=getattr(wheel_data, 'rear_left_' + suffix)[idx], text=text,
-                        name='Rear Left Wheel', color='blue')
-            _plot_trace(time=time, data=getattr(wheel_data, 'rear_right_' + suffix)[idx], text=text,
-                        name='Rear Right Wheel', color='purple')
-
-            figure.add_trace(go.Scattergl(x=time, y=wheel_data.gear[idx], text=text,
+            # Stack the values for all four wheels and remove invalid entries from all of them in one operation.
+            wheel_values = np.stack([getattr(wheel_data, wheel + '_' + suffix)
+                                     for wheel in ('front_left', 'front_right', 'rear_left', 'rear_right')])
+            wheel_values = np.compress(idx, wheel_values, axis=1)
+            for values, name, color in zip(wheel_values,
+                                           ('Front Left Wheel', 'Front Right Wheel', 'Rear Left Wheel',
+                                            'Rear Right Wheel'),
+                                           ('red', 'green', 'blue', 'purple')):
+                _plot_trace(time=time, data=values, name=name, color=color, abs_time_sec=abs_time_sec,
+                            hovertemplate=hovertemplate)
+
+            figure.add_trace(go.Scattergl(x=time, y=wheel_data.gear[idx], customdata=abs_time_sec,
+                                          hovertemplate=hovertemplate,
                                           name='Gear (Wheel Data)',
                                           mode='markers', marker={'color': 'red'}),
                              3, 1)
@@ -861,17 +1026,18 @@ class Analyzer(object):
             t0 = self._get_t0_for_time_source(vehicle_time_source)
             time = abs_time_sec - t0
             time_name = self._time_source_to_display_name(vehicle_time_source)
-            text = ["%s Time: %.3f sec" % (time_name, t) for t in abs_time_sec]
+            hovertemplate = '(%{x}, %{y})<br>' + time_name + ' Time: %{customdata:.3f} sec'
 
             if type == 'tick':
                 attr = 'tick_count'
             else:
                 attr = 'vehicle_speed_mps'
 
-            _plot_trace(time=time, data=getattr(vehicle_data, attr)[idx], text=text,
-                        name='Vehicle Data', color='orange')
+            _plot_trace(time=time, data=getattr(vehicle_data, attr)[idx], name='Vehicle Data', color='orange',
+                        abs_time_sec=abs_time_sec, hovertemplate=hovertemplate)
 
-            figure.add_trace(go.Scattergl(x=time, y=vehicle_data.gear[idx], text=text,
+            figure.add_trace(go.Scattergl(x=time, y=vehicle_data.gear[idx], customdata=abs_time_sec,
+                                          hovertemplate=hovertemplate,
                                           name='Gear (Vehicle Data)',
                                           mode='markers', marker={'color': 'orange'}),
                              3, 1)
@@ -901,31 +1067,15 @@ class Analyzer(object):
         figure = make_subplots(rows=2, cols=1, print_grid=False, shared_xaxes=True,
                                subplot_titles=['Acceleration', 'Gyro'])
 
-        figure['layout'].update(showlegend=True)
-        figure['layout']['xaxis1'].update(title="Time (sec)", showticklabels=True)
-        figure['layout']['xaxis2'].update(title="Time (sec)", showticklabels=True)
-        figure['layout']['yaxis1'].update(title="Acceleration (m/s^2)")
-        figure['layout']['yaxis2'].update(title="Rotation Rate (rad/s)")
-
-        figure.add_trace(go.Scattergl(x=time, y=data.accel_mps2[0, :], name='X', legendgroup='x',
-                                      mode='lines', line={'color': 'red'}),
-                         1, 1)
-        figure.add_trace(go.Scattergl(x=time, y=data.accel_mps2[1, :], name='Y', legendgroup='y',
-                                      mode='lines', line={'color': 'green'}),
-                         1, 1)
-        figure.add_trace(go.Scattergl(x=time, y=data.accel_mps2[2, :], name='Z', legendgroup='z',
-                                      mode='lines', line={'color': 'blue'}),
-                         1, 1)
+        figure.update_layout(showlegend=True,
+                             xaxis1={'title': "Time (sec)", 'showticklabels': True},
+                             xaxis2={'title': "Time (sec)", 'showticklabels': True},
+                             yaxis1={'title': "Acceleration (m/s^2)"},
+                             yaxis2={'title': "Rotation Rate (rad/s)"})
 
-        figure.add_trace(go.Scattergl(x=time, y=data.gyro_rps[0, :], name='X', legendgroup='x',
-                                      showlegend=False, mode='lines', line={'color': 'red'}),
-                         2, 1)
-        figure.add_trace(go.Scattergl(x=time, y=data.gyro_rps[1, :], name='Y', legendgroup='y',
-                                      showlegend=False, mode='lines', line={'color': 'green'}),
-                         2, 1)
-        figure.add_trace(go.Scattergl(x=time, y=data.gyro_rps[2, :], name='Z', legendgroup='z',
-                                      showlegend=False, mode='lines', line={'color': 'blue'}),
-                         2, 1)
+        _add_xyz_traces(figure, 1, 1, time, data.accel_mps2, names=('X', 'Y', 'Z'), legendgroups=('x', 'y', 'z'))
+        _add_xyz_traces(figure, 2, 1, time, data.gyro_rps, names=('X', 'Y', 'Z'), legendgroups=('x', 'y', 'z'),
+                        showlegend=False)
 
         self._add_figure(name="imu", figure=figure, title="Measurements: IMU")
 
@@ -940,26 +1090,106 @@ class Analyzer(object):
         result = self.reader.read(message_types=[EventNotificationMessage], remove_nan_times=False, **self.params)
         data = result[EventNotificationMessage.MESSAGE_TYPE]
 
-        if len(data.messages) == 0:
+        if len(data.system_time_ns) == 0:
             self.logger.info('No event notification data available.')
             return
 
         table_columns = ['Relative Time (s)', 'System Time (s)', 'Event', 'Flags', 'Description']
-        table_data = [[], [], [], [], []]
-        table_data[0] = [f'{(m.system_time_ns - self.reader.get_system_t0_ns()) / 1e9:.3f}' for m in data.messages]
-        table_data[1] = [f'{(m.system_time_ns) / 1e9:.3f}' for m in data.messages]
-        table_data[2] = [str(m.action) for m in data.messages]
-        table_data[3] = [f'0x{m.event_flags:016X}' for m in data.messages]
-        table_data[4] = [m.event_description.decode('utf-8') for m in data.messages]
+        # Compute the timestamps for all events at once, then format each column in a single vectorized call.
+        relative_time_sec = (data.system_time_ns - self.reader.get_system_t0_ns()) / 1e9
+        system_time_sec = data.system_time_ns / 1e9
+        # The actions are stored as integers. Display the name of each action, as returned by str(), in the same way as
+        # the action values in the messages.
+        action_names = {int(v): str(v) for v in EventNotificationMessage.Action}
+        table_data = [
+            np.char.mod('%.3f', relative_time_sec).tolist(),
+            np.char.mod('%.3f', system_time_sec).tolist(),
+            [action_names.get(a, str(a)) for a in data.action.tolist()],
+            np.char.mod('0x%016X', data.event_flags).tolist(),
+            [d.decode('utf-8') for d in data.event_description],
+        ]
 
         table_html = _data_to_table(table_columns, table_data)
-        body_html = f"""\
-<h2>Device Event Log</h2>
-<pre>{table_html}</pre>
-"""
+        body_html = ['<h2>Device Event Log</h2>\n<pre>', table_html, '</pre>\n']
 
         self._add_page(name='event_log', html_body=body_html, title="Event Log")
 
+    def run_plots(self, plots: List[Union[str, Tuple[str, dict]]], max_workers: int = 1):
+        """!
+        @brief Generate the specified plots, running them in parallel in separate processes when possible.
+
+        The plot functions do not depend on each other, so they can be run concurrently to take advantage of multiple
+        CPU cores. Worker processes are started using `fork`, so they inherit this analyzer and its file reader,
+        including any data that has already been read. Parallel generation is only supported on Linux: `fork` is not
+        available on Windows, and is not safe to use on macOS. On other platforms, or if `max_workers` is 1, the plots
+        will be generated serially in this process.
+
+        @param plots A list of plot function names (e.g., `'plot_pose'`), or `(name, kwargs)` tuples specifying
+               keyword arguments to be passed to the function.
+        @param max_workers The maximum number of worker processes to use. If `None`, use one per CPU. By default, the
+               plots are generated serially.
+        """
+        tasks = [(p, {}) if isinstance(p, str) else p for p in plots]
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = min(max_workers, len(tasks))
+
+        if self.output_dir is None or max_workers <= 1 or not sys.platform.startswith('linux'):
+            for name, kwargs in tasks:
+                getattr(self, name)(**kwargs)
+            return
+
+        # Generate the index file (if needed) before starting the workers so they don't each try to create it.
+        self.reader.generate_index()
+
+        # Most of the plots, as well as the summary created by generate_index(), use pose data. Read it once here so
+        # the workers inherit the cached data from this process, rather than each worker and then this process reading
+        # it separately.
+        self.reader.read(message_types=[PoseMessage], **self.params)
+
+        global _worker_analyzer
+        _worker_analyzer = self
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=multiprocessing.get_context('fork')) as executor:
+                results = list(executor.map(_run_plot, *zip(*tasks)))
+        finally:
+            _worker_analyzer = None
+
+        for plots, mapbox_token_missing in results:
+            for name, entry in plots.items():
+                if name in self.plots:
+                    raise ValueError('Plot "%s" already exists.' % name)
+                self._register_plot(name, entry['title'], entry['path'])
+            self._mapbox_token_missing |= mapbox_token_missing
+
+    def generate_all(self, parallel: bool = False, measurements: bool = False, mapbox_token: str = None,
+                     max_workers: int = None):
+        """!
+        @brief Generate all standard plots and tables for the log.
+
+        @param parallel If `True`, generate the plots in parallel worker processes. See @ref run_plots().
+        @param measurements If `True`, also plot incoming measurement data (IMU and wheel data).
+        @param mapbox_token A Mapbox token to use for satellite imagery. See @ref get_mapbox_token().
+        @param max_workers The maximum number of worker processes to use when `parallel` is `True`. If `None`, use
+               one per CPU.
+        """
+        plots = ['plot_time_scale',
+                 'plot_solution_type',
+                 'plot_pose',
+                 'plot_pose_displacement',
+                 'plot_relative_position_to_base_station',
+                 ('plot_map', {'mapbox_token': mapbox_token}),
+                 'plot_calibration']
+
+        if measurements:
+            plots += ['plot_imu', 'plot_wheel_data']
+
+        plots.append('generate_event_table')
+
+        self.run_plots(plots, max_workers=max_workers if parallel else 1)
+
     def generate_index(self, auto_open=True):
         """!
         @brief Generate an `index.html` page with links to all generated figures.
@@ -985,24 +1215,17 @@ class Analyzer(object):
         index_path = os.path.join(self.output_dir, self.prefix + 'index.html')
         index_dir = os.path.dirname(index_path)
 
-        links = ''
-        title_to_name = {e['title']: n for n, e in self.plots.items()}
-        titles = sorted(title_to_name.keys())
-        for title in titles:
-            name = title_to_name[title]
+        body_parts = []
+        for title, name in self._plot_titles:
             entry = self.plots[name]
-            link = '<br><a href="%s" target="_blank">%s</a>' % (os.path.relpath(entry['path'], index_dir), title)
-            links += link
+            body_parts.append('<br><a href="%s" target="_blank">%s</a>' %
+                              (os.path.relpath(entry['path'], index_dir), title))
 
-        index_html = _page_template % {
-            'title': 'FusionEngine Output',
-            'body': links + '\n<pre>' + self.summary.replace('\n', '<br>') + '</pre>'
-        }
+        body_parts += ['\n<pre>', self.summary.replace('\n', '<br>'), '</pre>']
 
         os.makedirs(index_dir, exist_ok=True)
-        with open(index_path, 'w') as f:
-            self.logger.info('Creating %s...' % index_path)
-            f.write(index_html)
+        self.logger.info('Creating %s...' % index_path)
+        _write_page(index_path, title='FusionEngine Output', body_parts=body_parts)
 
         if auto_open:
             self._open_browser(index_path)
@@ -1016,9 +1239,10 @@ class Analyzer(object):
         if self.params['absolute_time']:
             start_time, end_time = self.params['time_range']
         else:
+            t0 = float(self.t0)
             time_range = self.params['time_range']
-            start_time = None if time_range[0] is None else (time_range[0] + float(self.t0))
-            end_time = None if time_range[1] is None else (time_range[1] + float(self.t0))
+            start_time = None if time_range[0] is None else (time_range[0] + t0)
+            end_time = None if time_range[1] is None else (time_range[1] + t0)
 
         full_index = self.reader.index
         reduced_index = full_index[start_time:end_time]
@@ -1042,9 +1266,9 @@ class Analyzer(object):
         result = self.reader.read(message_types=[PoseMessage], **self.params)
         pose_data = result[PoseMessage.MESSAGE_TYPE]
         num_pose_messages = len(pose_data.solution_type)
-        solution_type_count = {}
-        for type, info in _SOLUTION_TYPE_MAP.items():
-            solution_type_count[info.name] = np.sum(pose_data.solution_type == type)
+        # Count all solution types in a single pass.
+        counts_by_type = np.bincount(pose_data.solution_type.astype(np.intp), minlength=max(_SOLUTION_TYPE_MAP) + 1)
+        solution_type_count = {info.name: counts_by_type[type] for type, info in _SOLUTION_TYPE_MAP.items()}
 
         types = list(solution_type_count.keys())
         counts = ['%d' % c for c in solution_type_count.values()]
@@ -1073,7 +1297,7 @@ class Analyzer(object):
 
         # Create a table with the types and counts of each FusionEngine message type in the log.
         message_types, message_counts = np.unique(reduced_index['type'], return_counts=True)
-        message_types = [MessageType.get_type_string(t) for t in message_types]
+        message_types = [_get_type_string(t) for t in message_types.tolist()]
 
         message_counts = message_counts.tolist()
         message_types.append(None)
@@ -1113,6 +1337,10 @@ class Analyzer(object):
 %(message_table)s
 """ % args
 
+    def _register_plot(self, name, title, path):
+        self.plots[name] = {'title': title, 'path': path}
+        bisect.insort(self._plot_titles, (title, name))
+
     def _add_page(self, name, html_body, title=None):
         if title is None:
             title = name
@@ -1125,16 +1353,13 @@ class Analyzer(object):
         path = os.path.join(self.output_dir, self.prefix + name + '.html')
         self.logger.info('Creating %s...' % path)
 
-        table_html = _page_template % {
-            'title': title,
-            'body': html_body
-        }
+        if isinstance(html_body, str):
+            html_body = [html_body]
 
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w') as fd:
-            fd.write(table_html)
+        _write_page(path, title=title, body_parts=html_body)
 
-        self.plots[name] = {'title': title, 'path': path}
+        self._register_plot(name, title, path)
 
     def _add_figure(self, name, figure, title=None):
         if title is None:
@@ -1146,18 +1371,30 @@ class Analyzer(object):
             raise ValueError('Plot name cannot be index.')
 
         path = os.path.join(self.output_dir, self.prefix + name + '.html')
+        data_path = os.path.splitext(path)[0] + '.js'
         self.logger.info('Creating %s...' % path)
 
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        plotly.offline.plot(
-            figure,
-            output_type='file',
-            filename=path,
-            include_plotlyjs=True,
-            auto_open=False,
-            show_link=False)
+        figure_dir = os.path.dirname(path)
+        if self.embed_plotlyjs:
+            # Note: URLs always use forward slashes, regardless of the OS path separator.
+            plotlyjs_url = pathlib.PurePath(os.path.relpath(os.path.join(self.output_dir, 'plotly.min.js'),
+                                                            figure_dir)).as_posix()
+        else:
+            plotlyjs_url = 'https://cdn.plot.ly/plotly-%s.min.js' % plotly.offline.get_plotlyjs_version()
 
-        self.plots[name] = {'title': title, 'path': path}
+        os.makedirs(figure_dir, exist_ok=True)
+        with open(data_path, 'w', buffering=_PAGE_WRITE_BUFFER_SIZE) as fd:
+            figure_json = plotly.io.to_json(figure, validate=False, **_TO_JSON_ARGS)
+            fd.write(_figure_data_template % {'figure_json': figure_json})
+
+        with open(path, 'w') as fd:
+            fd.write(_figure_page_template % {
+                'title': title,
+                'plotlyjs_url': plotlyjs_url,
+                'data_url': os.path.basename(data_path),
+            })
+
+        self._register_plot(name, title, path)
 
     def _open_browser(self, filename):
         try:
@@ -1183,14 +1420,11 @@ class Analyzer(object):
         return None
 
     def _get_t0_for_time_source(self, time_source: SystemTimeSource) -> float:
-        if time_source == SystemTimeSource.P1_TIME:
-            return float(self.t0)
-        elif time_source == SystemTimeSource.GPS_TIME:
-            return 0.0
-        elif time_source == SystemTimeSource.SENDER_SYSTEM_TIME:
-            return 0.0
-        elif time_source == SystemTimeSource.TIMESTAMPED_ON_RECEPTION:
-            return float(self.system_t0)
+        if time_source not in _T0_ATTR_BY_TIME_SOURCE:
+            return None
+
+        attr = _T0_ATTR_BY_TIME_SOURCE[time_source]
+        return 0.0 if attr is None else float(getattr(self, attr))
 
     @classmethod
     def _get_measurement_time(cls, data, time_source: SystemTimeSource) -> np.ndarray:
@@ -1201,14 +1435,7 @@ class Analyzer(object):
 
     @classmethod
     def _time_source_to_display_name(cls, time_source: SystemTimeSource) -> str:
-        if time_source == SystemTimeSource.P1_TIME:
-            return 'P1'
-        elif time_source == SystemTimeSource.GPS_TIME:
-            return 'GPS'
-        elif time_source == SystemTimeSource.SENDER_SYSTEM_TIME:
-            return 'External'
-        elif time_source == SystemTimeSource.TIMESTAMPED_ON_RECEPTION:
-            return 'System'
+        return _TIME_SOURCE_DISPLAY_NAME.get(time_source, None)
 
 
 def main():
@@ -1218,6 +1445,13 @@ Load and display information stored in a FusionEngine binary file.
     parser.add_argument('--absolute-time', '--abs', action='store_true',
                         help="Interpret the timestamps in --time as absolute P1 times. Otherwise, treat them as "
                              "relative to the first message in the file.")
+    parser.add_argument('-j', '--jobs', type=int, metavar='N', default=1,
+                        help="The maximum number of plots to generate in parallel (Linux only). Set to 0 to use one "
+                             "process per CPU. By default, the plots are generated serially.")
+    parser.add_argument('--embed-plotlyjs', action='store_true',
+                        help="Store a local copy of plotly.js in the output directory for offline viewing. Otherwise, "
+                             "the generated plots load plotly.js from the CDN, and require network access to be "
+                             "viewed.")
     parser.add_argument('--ignore-index', action='store_true',
                         help="If set, do not load the .p1i index file corresponding with the .p1log data file. If "
                              "specified and a .p1i file does not exist, do not generate one. Otherwise, a .p1i file "
@@ -1267,24 +1501,13 @@ Load and display information stored in a FusionEngine binary file.
 
     # Parse the time range.
     if options.time is not None:
-        time_range = options.time.split(':')
-        if len(time_range) == 0:
-            time_range = [None, None]
-        elif len(time_range) == 1:
-            time_range.append(None)
-        elif len(time_range) == 2:
-            pass
-        else:
+        m = _TIME_RANGE_RE.match(options.time)
+        if m is None:
             raise ValueError('Invalid time range specification.')
 
-        for i in range(2):
-            if time_range[i] is not None:
-                if time_range[i] == '':
-                    time_range[i] = None
-                else:
-                    time_range[i] = float(time_range[i])
-                    if time_range[i] < 0.0:
-                        time_range[i] = None
+        # Empty or negative values are treated as unbounded.
+        time_range = [float(t) if t else None for t in (m['start'], m['end'])]
+        time_range = [None if t is not None and t < 0.0 else t for t in time_range]
     else:
         time_range = None
 
@@ -1309,21 +1532,11 @@ Load and display information stored in a FusionEngine binary file.
     # Read pose data from the file.
     analyzer = Analyzer(file=input_path, output_dir=output_dir, ignore_index=options.ignore_index,
                         prefix=options.prefix + '.' if options.prefix is not None else '',
-                        time_range=time_range, absolute_time=options.absolute_time)
-
-    analyzer.plot_time_scale()
-    analyzer.plot_solution_type()
-    analyzer.plot_pose()
-    analyzer.plot_pose_displacement()
-    analyzer.plot_relative_position_to_base_station()
-    analyzer.plot_map(mapbox_token=options.mapbox_token)
-    analyzer.plot_calibration()
-
-    if options.measurements:
-        analyzer.plot_imu()
-        analyzer.plot_wheel_data()
+                        time_range=time_range, absolute_time=options.absolute_time,
+                        embed_plotlyjs=options.embed_plotlyjs)
 
-    analyzer.generate_event_table()
+    analyzer.generate_all(parallel=options.jobs != 1, measurements=options.measurements,
+                          mapbox_token=options.mapbox_token, max_workers=options.jobs if options.jobs > 0 else None)
 
     analyzer.generate_index(auto_open=not options.no_index)
 
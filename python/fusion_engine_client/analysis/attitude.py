@@ -1,5 +1,39 @@
 import numpy as np
 
+# WGS-84 ellipsoid parameters.
+_WGS84_A = 6378137.0
+_WGS84_F = 1.0 / 298.257223563
+_WGS84_E2 = _WGS84_F * (2.0 - _WGS84_F)
+
+
+def geodetic_to_ecef(latitude, longitude, altitude, deg=False):
+    """!
+    @brief Convert WGS-84 geodetic coordinates to ECEF position.
+
+    The inputs may be scalars or NumPy arrays of equal length. The conversion is vectorized across all points.
+
+    @param latitude The latitude (in rad).
+    @param longitude The longitude (in rad).
+    @param altitude The altitude above the WGS-84 ellipsoid (in meters).
+    @param deg If @c True, interpret @c latitude and @c longitude in degrees instead of radians.
+
+    @return A 3xN @c np.array containing the ECEF X, Y, and Z position (in meters).
+    """
+    if deg:
+        latitude = np.deg2rad(latitude)
+        longitude = np.deg2rad(longitude)
+
+    cos_lat = np.cos(latitude)
+    sin_lat = np.sin(latitude)
+
+    # Prime vertical radius of curvature.
+    n = _WGS84_A / np.sqrt(1.0 - _WGS84_E2 * sin_lat * sin_lat)
+
+    r_xy = (n + altitude) * cos_lat
+    return np.array((r_xy * np.cos(longitude),
+                     r_xy * np.sin(longitude),
+                     (n * (1.0 - _WGS84_E2) + altitude) * sin_lat))
+
 
 def get_ned_rotation_matrix(latitude, longitude, deg=False):
     """!
@@ -3,7 +3,6 @@ from __future__ import annotations
 from typing import Union
 
 from collections import namedtuple
-import copy
 import io
 import os
 
@@ -16,16 +15,46 @@ from ..utils.time_range import TimeRange
 FileIndexEntry = namedtuple('Element', ['time', 'type', 'offset'])
 
 
+# Lookup table from integer value to MessageType, which is much faster than calling the enum constructor per entry.
+_MESSAGE_TYPES = {int(t): t for t in MessageType}
+
+# Lookup table from MessageType to integer value, which is faster than calling int() on the enum. Lookups use
+# `get(message_type, message_type)` so unrecognized values passed as a plain `int` are returned unchanged.
+_MESSAGE_TYPE_VALUES = {t: int(t) for t in MessageType}
+
+
+def _to_message_type(value):
+    message_type = _MESSAGE_TYPES.get(value, None)
+    return MessageType(value) if message_type is None else message_type
+
+
 class FileIndexIterator(object):
-    def __init__(self, np_iterator):
-        self.np_iterator = np_iterator
+    # Entries are converted to Python values in blocks of this size using tolist(), rather than creating NumPy scalars
+    # for each field of each entry.
+    _BLOCK_SIZE = 4096
+
+    def __init__(self, index):
+        self.index = index
+        self.block = iter(())
+        self.next_idx = 0
+
+    def __iter__(self):
+        return self
 
     def __next__(self):
-        if self.np_iterator is None:
-            raise StopIteration()
-        else:
-            entry = next(self.np_iterator)
-            return FileIndexEntry(time=Timestamp(entry[0]), type=MessageType(entry[1]), offset=entry[2])
+        entry = next(self.block, None)
+        if entry is None:
+            if self.index is None or self.next_idx >= len(self.index):
+                raise StopIteration()
+
+            block = slice(self.next_idx, self.next_idx + self._BLOCK_SIZE)
+            self.next_idx += self._BLOCK_SIZE
+            self.block = zip(self.index.time[block].tolist(), self.index.type[block].tolist(),
+                             self.index.offset[block].tolist())
+            entry = next(self.block)
+
+        time, type, offset = entry
+        return FileIndexEntry(time=Timestamp(time), type=_to_message_type(type), offset=offset)
 
 
 class FileIndex(object):
@@ -115,13 +144,29 @@ class FileIndex(object):
         log_file.seek(entry.offset, io.SEEK_SET)
         ...
     ```
+
+    Indexing with a single integer returns the @ref FileIndexEntry for that element, rather than a @ref FileIndex:
+
+    ```py
+    entry = file_index[2]
+    log_file.seek(entry.offset, io.SEEK_SET)
+    ```
     """
     # Note: To reduce the index file size, we've made the following limitations:
     # - Fractional timestamp is floored so time 123.4 becomes 123. The data read should not assume that an entry's
     #   timestamp is its exact time
     _RAW_DTYPE = np.dtype([('int', '<u4'), ('type', '<u2'), ('offset', '<u8')])
 
-    _DTYPE = np.dtype([('time', '<f8'), ('type', '<u2'), ('offset', '<u8')])
+    # Note: Offsets are stored in memory as signed integers, which NumPy and Python handle more efficiently than uint64
+    # (e.g., when passed to seek()), but unsigned in the file for compatibility.
+    _DTYPE = np.dtype([('time', '<f8'), ('type', '<u2'), ('offset', '<i8')])
+
+    # Note: The index is stored in memory as three separate contiguous arrays, `time`, `type`, and `offset` (see
+    # _set_columns()), rather than a single `_DTYPE` structured array. Scanning or searching a field of a structured
+    # array uses strided access, which is much slower than operating on a contiguous array. The structured `_RAW_DTYPE`
+    # layout is only assembled when saving the index to disk.
+    __slots__ = ('_num_entries', 't0', 'time', 'type', 'offset',
+                 '_search_time', '_type_to_rows', '_type_lookup_count')
 
     def __init__(self, index_path: str = None, data_path: str = None, delete_on_error=True,
                  data: Union[np.ndarray, list] = None, t0: Timestamp = None):
@@ -133,37 +178,55 @@ class FileIndex(object):
                index entries. If `None`, defaults to `filename.p1log` if it exists.
         @param delete_on_error If `True`, delete the index file if an error is detected before raising an exception.
                Otherwise, leave the file unchanged.
-        @param data A NumPy `ndarray` or Python `list` containing information about each FusionEngine message in the
-               `.p1log` file. For internal use.
+        @param data A NumPy `ndarray` (with dtype `FileIndex._DTYPE`) or Python `list` containing information about
+               each FusionEngine message in the `.p1log` file. For internal use.
         @param t0 The P1 time corresponding with the start of the `.p1log` file, if known. For internal use.
         """
-        if data is None:
-            self._data = None
-        else:
+        if data is not None:
             if isinstance(data, list):
-                self._data = np.array(data, dtype=FileIndex._DTYPE)
-            elif data.dtype == FileIndex._DTYPE:
-                self._data = data
-            else:
-                raise ValueError('Unsupported array format.')
-
-        if index_path is not None:
-            if self._data is None:
-                self.load(index_path=index_path, data_path=data_path, delete_on_error=delete_on_error)
-            else:
+                data = np.array(data, dtype=FileIndex._DTYPE)
+            elif data.dtype != FileIndex._DTYPE:
+                # Convert arrays with the same fields but different types (e.g., the unsigned offsets used prior to
+                # storing them as signed integers in memory).
+                if data.dtype.names != FileIndex._DTYPE.names:
+                    raise ValueError('Unsupported array format.')
+                data = data.astype(FileIndex._DTYPE)
+
+            if index_path is not None:
                 raise ValueError('Cannot specify both path and data.')
 
-        if self._data is None:
-            self._data = np.array([], dtype=FileIndex._DTYPE)
+            self._set_columns(np.ascontiguousarray(data['time']), np.ascontiguousarray(data['type']),
+                              np.ascontiguousarray(data['offset']))
+        elif index_path is not None:
+            self.load(index_path=index_path, data_path=data_path, delete_on_error=delete_on_error)
+        else:
+            self._set_columns(*FileIndex._empty_columns())
+
+        self._init_t0(t0)
+
+    @classmethod
+    def _from_columns(cls, time: np.ndarray, type: np.ndarray, offset: np.ndarray, t0: Timestamp = None) -> FileIndex:
+        # Construct an index directly from (contiguous) column arrays, without going through a structured array.
+        index = cls.__new__(cls)
+        index._set_columns(time, type, offset)
+        index._init_t0(t0)
+        return index
 
+    def _init_t0(self, t0):
         if t0 is not None:
             self.t0 = t0
-        elif len(self._data) == 0:
+        elif self._num_entries == 0:
             self.t0 = None
         else:
-            idx = np.argmax(~np.isnan(self._data['time']))
+            # Find the first entry with a valid P1 time. In most logs, one appears almost immediately, so check the
+            # first few entries before scanning the whole array.
+            time = self.time
+            idx = np.argmax(~np.isnan(time[:1024]))
+            if np.isnan(time[idx]):
+                idx = np.argmax(~np.isnan(time))
+
             if idx >= 0:
-                self.t0 = Timestamp(self._data['time'][idx])
+                self.t0 = Timestamp(time[idx])
             else:
                 self.t0 = None
 
@@ -178,8 +241,15 @@ class FileIndex(object):
                Otherwise, leave the file unchanged.
         """
         if os.path.exists(index_path):
-            raw_data = np.fromfile(index_path, dtype=FileIndex._RAW_DTYPE)
-            self._data = FileIndex._from_raw(raw_data)
+            # Memory-map the file rather than reading it into a temporary buffer, so the only full copy of the data is
+            # the converted array. As with np.fromfile(), any trailing partial entry is ignored.
+            num_entries = os.path.getsize(index_path) // FileIndex._RAW_DTYPE.itemsize
+            if num_entries > 0:
+                raw_data = np.memmap(index_path, dtype=FileIndex._RAW_DTYPE, mode='r', shape=(num_entries,))
+                self._set_columns(*FileIndex._from_raw(raw_data))
+                del raw_data
+            else:
+                self._set_columns(*FileIndex._empty_columns())
         else:
             raise FileNotFoundError("Index file '%s' does not exist." % index_path)
 
@@ -191,17 +261,15 @@ class FileIndex(object):
             if not os.path.exists(data_path):
                 # If the user didn't explicitly set data_path and the default file doesn't exist, it is not considered
                 # an error.
-                if self._data['type'][-1] == MessageType.INVALID:
-                    self._data = self._data[:-1]
+                if self._num_entries > 0 and self.type[-1] == MessageType.INVALID:
+                    self._drop_last()
                 return
         elif not os.path.exists(data_path):
             raise ValueError("Specified data file '%s' not found." % data_path)
 
         with open(data_path, 'rb') as data_file:
             # Compute the data file size.
-            data_file.seek(0, io.SEEK_END)
-            data_file_size = data_file.tell()
-            data_file.seek(0, 0)
+            data_file_size = os.fstat(data_file.fileno()).st_size
 
             # Check for empty files.
             if data_file_size == 0 and len(self) != 0:
@@ -218,7 +286,7 @@ class FileIndex(object):
             # use it to check if the data file size has changed.
             if self.type[-1] == MessageType.INVALID:
                 expected_data_file_size = self.offset[-1]
-                self._data = self._data[:-1]
+                self._drop_last()
 
                 if data_file_size == expected_data_file_size:
                     # If this check passes, we don't need to continue with the other checks below.
@@ -242,9 +310,13 @@ class FileIndex(object):
 
             # Read the header of the last entry to get its size, then use that to compute the expected data file size
             # from the offset in the last index entry.
-            data_file.seek(last_offset, io.SEEK_SET)
-            buffer = data_file.read(MessageHeader.calcsize())
-            data_file.seek(0, io.SEEK_SET)
+            #
+            # Where available (POSIX), use pread() to read the header at the specified offset in a single call.
+            if hasattr(os, 'pread'):
+                buffer = os.pread(data_file.fileno(), MessageHeader.calcsize(), last_offset)
+            else:
+                data_file.seek(last_offset, io.SEEK_SET)
+                buffer = data_file.read(MessageHeader.calcsize())
 
             header = MessageHeader()
             header.unpack(buffer=buffer, warn_on_unrecognized=False)
@@ -264,19 +336,19 @@ class FileIndex(object):
         @param index_path The path to the file to be written.
         @param data_path The path to the `.p1log` file.
         """
-        if len(self._data) > 0:
-            # Append an EOF marker at the end of the data if data_path is specified.
-            data = self._data
-            if data['type'][-1] != MessageType.INVALID and data_path is not None:
-                file_size_bytes = os.stat(data_path).st_size
-                data = np.append(data, np.array((np.nan, int(MessageType.INVALID), file_size_bytes),
-                                                dtype=FileIndex._DTYPE))
-
-            raw_data = FileIndex._to_raw(data)
+        if self._num_entries > 0:
+            raw_data = FileIndex._to_raw(self.time, self.type, self.offset)
 
             if os.path.exists(index_path):
                 os.remove(index_path)
-            raw_data.tofile(index_path)
+
+            with open(index_path, 'wb') as f:
+                raw_data.tofile(f)
+
+                # Append an EOF marker at the end of the data if data_path is specified. The marker is written
+                # separately, rather than appended to the array, to avoid copying the entire index.
+                if self.type[-1] != MessageType.INVALID and data_path is not None:
+                    FileIndex._write_marker(f, data_path)
 
     def get_time_range(self, start: Union[Timestamp, float] = None, stop: Union[Timestamp, float] = None,
                        hint: str = None) -> FileIndex:
@@ -291,73 +363,182 @@ class FileIndex(object):
                - `include_nans` - Include nan elements within the requested time range (default)
                - `remove_nans` - Do not return nan elements; remove elements falling within the requested time range
         """
+        return self.filter(start=start, stop=stop, hint=hint)
+
+    def filter(self, message_types=None, start: Union[Timestamp, float] = None,
+               stop: Union[Timestamp, float] = None, hint: str = None) -> FileIndex:
+        """!
+        @brief Get a subset of the contents for one or more message types within a specified time range.
+
+        This is equivalent to `index[message_types].get_time_range(start, stop, hint)`, but does not create an
+        intermediate @ref FileIndex for the selected message types. Instead, the type and time range selections are
+        combined into a single list of entries, which is then copied once.
+
+        @param message_types A @ref MessageType or @ref MessagePayload class, or a list of them. If `None`, include all
+               message types.
+        @param start The P1 time at the start of the desired time range.
+        @param stop The P1 time at the end of the desired time range.
+        @param hint A hint indicating how to handle entries that do not have P1 time. See @ref get_time_range().
+        """
         if hint is None:
             hint = 'include_nans'
 
-        # No data available. Skip time indexing (argmax will fail on an empty vector).
-        if len(self._data) == 0:
-            return FileIndex(data=self._data, t0=self.t0)
+        # Find the entries for the requested message types, in file order.
+        if message_types is None:
+            rows = None
         else:
-            # Note: The index stores only the integer part of the timestamp.
-            start_idx = np.argmax(self._data['time'] >= np.floor(start)) if start is not None else 0
-            end_idx = np.argmax(self._data['time'] >= stop) if stop is not None else len(self._data)
-
+            if isinstance(message_types, MessageType) or MessagePayload.is_subclass(message_types):
+                message_types = [message_types]
+            rows = self._get_type_rows([t.get_type() if MessagePayload.is_subclass(t) else t for t in message_types])
+
+        # No data available, or no time range specified.
+        if self._num_entries == 0 or (start is None and stop is None and hint == 'include_nans'):
+            return self._select(rows)
+
+        if hint not in ('include_nans', 'remove_nans', 'all_nans'):
+            raise ValueError('Unrecognized control hint.')
+
+        # Find the time range boundaries. When message types are specified, search the times of the selected entries
+        # only, as get_time_range() would for `index[message_types]`. That way, an entry without P1 time is placed
+        # relative to the other entries of the selected types, not relative to entries of other types. In that case,
+        # `start_idx` and `end_idx` are positions within `rows`.
+        if rows is None:
+            search_time = self._get_search_time()
+        else:
+            rows_time = self.time[rows]
+            search_time = FileIndex._make_search_time(rows_time)
+
+        # Note: The index stores only the integer part of the timestamp.
+        start_idx = np.searchsorted(search_time, np.floor(float(start)), side='left') if start is not None else 0
+        end_idx = np.searchsorted(search_time, float(stop), side='left') if stop is not None else len(search_time)
+        # If the stop time is before the start time, the range is empty.
+        end_idx = max(end_idx, start_idx)
+
+        # No message types specified: the entries within the time range are a contiguous slice of the data, so we can
+        # operate on that slice directly without constructing a list of row indices.
+        if rows is None:
             if hint == 'include_nans':
-                return FileIndex(data=self._data[start_idx:end_idx], t0=self.t0)
+                return self._select(slice(start_idx, end_idx))
+            elif hint == 'remove_nans':
+                return self._select(start_idx + np.flatnonzero(~np.isnan(self.time[start_idx:end_idx])))
             else:
-                idx = np.full_like(self._data['time'], False, dtype=bool)
-                idx[start_idx:end_idx] = True
-
-                nan_idx = np.isnan(self._data['time'])
-                if hint == 'all_nans':
-                    idx[nan_idx] = True
-                elif hint == 'remove_nans':
-                    idx[nan_idx] = False
-                else:
-                    raise ValueError('Unrecognized control hint.')
+                # For all_nans, add the nan entries before and after the time range. All of the pieces are sorted, so
+                # we can concatenate them in order instead of merging them.
+                nan_rows = np.flatnonzero(np.isnan(self.time))
+                return self._select(np.concatenate((nan_rows[:np.searchsorted(nan_rows, start_idx)],
+                                                    np.arange(start_idx, end_idx),
+                                                    nan_rows[np.searchsorted(nan_rows, end_idx):])))
+        # Otherwise, the entries for the selected types within the time range are a contiguous block of `rows`.
+        else:
+            in_range_rows = rows[start_idx:end_idx]
+            if hint == 'include_nans':
+                return self._select(in_range_rows)
 
-            return FileIndex(data=self._data[idx], t0=self.t0)
+            is_nan = np.isnan(rows_time)
+            if hint == 'remove_nans':
+                return self._select(in_range_rows[~is_nan[start_idx:end_idx]])
+            else:
+                # For all_nans, add the nan entries of the selected types before and after the time range.
+                return self._select(np.concatenate((rows[:start_idx][is_nan[:start_idx]],
+                                                    in_range_rows,
+                                                    rows[end_idx:][is_nan[end_idx:]])))
+
+    def _get_search_time(self):
+        # P1 timestamps are increasing, but entries without P1 time are stored as nan, which searchsorted() cannot
+        # handle. Replace each nan with the most recent valid time before it (or -inf if none) so the array is sorted.
+        # The first element >= a given time is always a valid entry, so the search results are unchanged.
+        if self._search_time is None:
+            self._search_time = FileIndex._make_search_time(self.time)
+        return self._search_time
+
+    @staticmethod
+    def _make_search_time(time):
+        return np.fmax.accumulate(np.where(np.isnan(time), -np.inf, time))
+
+    def _get_type_rows(self, message_types):
+        message_types = set(_MESSAGE_TYPE_VALUES.get(t, t) for t in message_types)
+
+        # Many indices are only queried by type once (e.g., to create a filtered copy). For the first lookup, mark the
+        # requested types in a 64K-entry lookup table (MessageType is a uint16) and select the matching rows with a
+        # single gather, which is cheaper than grouping the rows below.
+        if self._type_to_rows is None and self._type_lookup_count == 0:
+            self._type_lookup_count += 1
+            lut = np.zeros(1 << 16, dtype=bool)
+            lut[list(message_types)] = True
+            return np.flatnonzero(lut[self.type])
+
+        # If the index is queried repeatedly, group the rows by message type once, then serve subsequent type lookups
+        # from the cached row indices instead of scanning the full type column each time.
+        if self._type_to_rows is None:
+            types = self.type
+            order = np.argsort(types, kind='stable')
+            unique_types, starts = np.unique(types[order], return_index=True)
+            self._type_to_rows = dict(zip(unique_types.tolist(), np.split(order, starts[1:])))
+
+        rows = [self._type_to_rows[t] for t in message_types if t in self._type_to_rows]
+        if len(rows) == 0:
+            return np.array([], dtype=int)
+        elif len(rows) == 1:
+            return rows[0]
+        else:
+            # Return the entries in file order.
+            return np.sort(np.concatenate(rows))
 
-    def __len__(self):
-        return len(self._data['time'])
-
-    def __getattr__(self, key):
-        if key == 'time':
-            return self._data['time']
-        elif key == 'type':
-            return self._data['type']
-        elif key == 'offset':
-            return self._data['offset']
+    def _select(self, rows):
+        # Create a new index containing the specified rows (a slice or an array of row indices), or all rows if `None`.
+        if rows is None:
+            return FileIndex._from_columns(self.time, self.type, self.offset, t0=self.t0)
         else:
-            raise AttributeError
+            return FileIndex._from_columns(self.time[rows], self.type[rows], self.offset[rows], t0=self.t0)
+
+    def _drop_last(self):
+        self._set_columns(self.time[:-1], self.type[:-1], self.offset[:-1])
+
+    def _set_columns(self, time, type, offset):
+        self._num_entries = len(time)
+        self.time = time
+        self.type = type
+        self.offset = offset
+
+        # Sorted timestamps used for binary searching by time, created on first use. See _get_search_time().
+        self._search_time = None
+        # Row indices for each message type, created when the index is queried by type more than once. See
+        # _get_type_rows().
+        self._type_to_rows = None
+        self._type_lookup_count = 0
+
+    def __len__(self):
+        return self._num_entries
 
     def __getitem__(self, key):
-        # No key specified (convenience case).
+        # No key specified (convenience case). FileIndex contents are never modified in place, so there's no need to
+        # return a copy.
         if key is None:
-            return copy.copy(self)
+            return self
         # No data available.
-        elif len(self._data) == 0:
+        elif self._num_entries == 0:
             return FileIndex()
         # Key is a string (e.g., index['type']), defer to getattr() (e.g., index.type).
         elif isinstance(key, str):
             return getattr(self, key)
         # Return entries for a specific message type.
         elif isinstance(key, MessageType):
-            idx = self._data['type'] == key
-            return FileIndex(data=self._data[idx], t0=self.t0)
+            idx = self._get_type_rows([key])
+            return self._select(idx)
         elif MessagePayload.is_subclass(key):
-            idx = self._data['type'] == key.get_type()
-            return FileIndex(data=self._data[idx], t0=self.t0)
+            idx = self._get_type_rows([key.get_type()])
+            return self._select(idx)
         # Return entries for a list of message types.
         elif isinstance(key, (set, list, tuple)) and len(key) > 0 and isinstance(next(iter(key)), MessageType):
-            idx = np.isin(self._data['type'], [int(k) for k in key])
-            return FileIndex(data=self._data[idx], t0=self.t0)
+            idx = self._get_type_rows(key)
+            return self._select(idx)
         elif isinstance(key, (set, list, tuple)) and len(key) > 0 and MessagePayload.is_subclass(next(iter(key))):
-            idx = np.isin(self._data['type'], [int(k.get_type()) for k in key])
-            return FileIndex(data=self._data[idx], t0=self.t0)
+            idx = self._get_type_rows([k.get_type() for k in key])
+            return self._select(idx)
         # Return a single element by index.
-        elif isinstance(key, int):
-            return FileIndex(data=self._data[key:(key + 1)], t0=self.t0)
+        elif isinstance(key, (int, np.integer)):
+            return FileIndexEntry(time=Timestamp(float(self.time[key])), type=_to_message_type(int(self.type[key])),
+                                  offset=int(self.offset[key]))
         # Key is a slice in time. Return a subset of the data.
         #
         # For convenience, the user may optionally include a hint string in the `step` portion of the slicing range. For
@@ -382,21 +563,20 @@ class FileIndex(object):
             return self.get_time_range(start, end, 'include_nans')
         # Key is an index slice or a list of individual element indices. Return a subset of the data.
         elif isinstance(key, slice):
-            return FileIndex(data=self._data[key], t0=self.t0)
+            return self._select(key)
         elif isinstance(key, (set, list, tuple)):
             if len(key) > 0:
-                key = np.array(key)
-                return FileIndex(data=self._data[key], t0=self.t0)
+                return self._select(np.array(key))
             else:
                 return FileIndex(data=[], t0=self.t0)
         else:
             raise ValueError('Unsupported key type.')
 
     def __iter__(self):
-        if len(self._data) == 0:
+        if self._num_entries == 0:
             return FileIndexIterator(None)
         else:
-            return FileIndexIterator(iter(self._data))
+            return FileIndexIterator(self)
 
     @classmethod
     def get_path(cls, data_path):
@@ -409,19 +589,35 @@ class FileIndex(object):
         """
         return os.path.splitext(data_path)[0] + '.p1i'
 
+    @classmethod
+    def _write_marker(cls, f, data_path):
+        file_size_bytes = os.stat(data_path).st_size
+        marker = np.array((Timestamp._INVALID, int(MessageType.INVALID), file_size_bytes), dtype=cls._RAW_DTYPE)
+        marker.tofile(f)
+
+    @classmethod
+    def _empty_columns(cls):
+        return (np.array([], dtype=cls._DTYPE['time']), np.array([], dtype=cls._DTYPE['type']),
+                np.array([], dtype=cls._DTYPE['offset']))
+
     @classmethod
     def _from_raw(cls, raw_data):
-        idx = raw_data['int'] == Timestamp._INVALID
-        data = raw_data.astype(dtype=cls._DTYPE)
-        data['time'][idx] = np.nan
-        return data
+        # Copy each field of the raw structured array into its own contiguous column.
+        raw_time = raw_data['int']
+        time = raw_time.astype(cls._DTYPE['time'])
+        time[raw_time == Timestamp._INVALID] = np.nan
+        return time, raw_data['type'].astype(cls._DTYPE['type']), raw_data['offset'].astype(cls._DTYPE['offset'])
 
     @classmethod
-    def _to_raw(cls, data):
-        time_sec = data['time']
-        idx = np.isnan(time_sec)
-        raw_data = data.astype(dtype=cls._RAW_DTYPE)
-        raw_data['int'][idx] = Timestamp._INVALID
+    def _to_raw(cls, time, type, offset):
+        # Fill each column of the structured array directly. This also avoids casting nan timestamps to integers, which
+        # is undefined.
+        valid_idx = ~np.isnan(time)
+        raw_data = np.empty(len(time), dtype=cls._RAW_DTYPE)
+        raw_data['int'] = Timestamp._INVALID
+        raw_data['int'][valid_idx] = time[valid_idx]
+        raw_data['type'] = type
+        raw_data['offset'] = offset
         return raw_data
 
 
@@ -430,9 +626,46 @@ class FileIndexBuilder(object):
     @brief Helper class for constructing a @ref FileIndex.
 
     This class can be used to construct a @ref FileIndex and a corresponding `.p1i` file when reading a `.p1log` file.
+
+    By default, the index entries are accumulated in memory. For very large files, use @ref stream_to_file() to write
+    the entries to the `.p1i` file as they are added instead, so that the full index is never held in memory:
+
+    ```py
+    builder = FileIndexBuilder()
+    builder.stream_to_file(index_path)
+    for header, message, offset_bytes in reader:
+        builder.append(message_type=header.message_type, offset_bytes=offset_bytes, p1_time=message.get_p1_time())
+    builder.close(data_path)
+    ```
+
+    The entries are written to a temporary file, which replaces `index_path` when @ref close() is called. If the
+    builder is discarded before then, or @ref abort() is called, the temporary file is deleted and any existing index
+    file is left unchanged.
     """
+    # Initial number of entries allocated. The buffers double in size whenever they fill up.
+    _INITIAL_CAPACITY = 1024
+
+    # Maximum number of entries buffered in memory when streaming the index to disk.
+    _STREAM_BUFFER_SIZE = 65536
+
+    # Number of entries collected by from_file() before copying them into the buffers.
+    _BATCH_SIZE = 8192
+
+    __slots__ = ('_time', '_type', '_offset', '_num_entries', '_file', '_index_path', '_num_written')
+
     def __init__(self):
-        self.raw_data = []
+        # Entries are stored in one preallocated array per field, rather than a list of tuples, so that to_index() can
+        # copy each column directly instead of converting every entry individually.
+        self._time = np.empty(self._INITIAL_CAPACITY, dtype=FileIndex._DTYPE['time'])
+        self._type = np.empty(self._INITIAL_CAPACITY, dtype=FileIndex._DTYPE['type'])
+        self._offset = np.empty(self._INITIAL_CAPACITY, dtype=FileIndex._DTYPE['offset'])
+        self._num_entries = 0
+
+        # When streaming to disk, the temporary output file, the final index path, and the number of entries already
+        # written to the file.
+        self._file = None
+        self._index_path = None
+        self._num_written = 0
 
     def from_file(self, data_path: str):
         """!
@@ -444,9 +677,26 @@ class FileIndexBuilder(object):
         """
         from ..parsers import MixedLogReader
         reader = MixedLogReader(data_path, ignore_index=True, return_offset=True)
+
+        # Collect the entries in local lists and copy them into the buffers in batches, rather than calling append()
+        # for each message. Message types are stored as plain integers, which NumPy converts much faster than enums.
+        nan = float('nan')
+        type_values = _MESSAGE_TYPE_VALUES
+        times = []
+        types = []
+        offsets = []
         for header, message, offset_bytes in reader:
             p1_time = message.get_p1_time()
-            self.append(message_type=header.message_type, offset_bytes=offset_bytes, p1_time=p1_time)
+            times.append(nan if p1_time is None else float(p1_time))
+            types.append(type_values.get(header.message_type, header.message_type))
+            offsets.append(offset_bytes)
+            if len(times) == self._BATCH_SIZE:
+                self._extend(times, types, offsets)
+                times.clear()
+                types.clear()
+                offsets.clear()
+
+        self._extend(times, types, offsets)
         return self.to_index()
 
     def append(self, message_type: MessageType, offset_bytes: int, p1_time: Timestamp = None):
@@ -462,7 +712,17 @@ class FileIndexBuilder(object):
         else:
             time_sec = float(p1_time)
 
-        self.raw_data.append((time_sec, int(message_type), offset_bytes))
+        if self._num_entries == len(self._time):
+            if self._file is not None and self._num_entries >= self._STREAM_BUFFER_SIZE:
+                self._flush()
+            else:
+                self._grow()
+
+        idx = self._num_entries
+        self._time[idx] = time_sec
+        self._type[idx] = _MESSAGE_TYPE_VALUES.get(message_type, message_type)
+        self._offset[idx] = offset_bytes
+        self._num_entries += 1
 
     def save(self, index_path: str, data_path: str):
         """!
@@ -475,13 +735,119 @@ class FileIndexBuilder(object):
         index.save(index_path, data_path)
         return index
 
+    def stream_to_file(self, index_path: str):
+        """!
+        @brief Write index entries directly to a `.p1i` file as they are added, rather than accumulating them in memory.
+
+        Any entries already added are written immediately. Subsequent entries are buffered and written to a temporary
+        file (`<index_path>.tmp`) in blocks. Call @ref close() once all entries have been added to complete the file,
+        or @ref abort() to discard it.
+
+        @param index_path The path to the file to be written.
+        """
+        if self._file is not None:
+            raise ValueError('Index is already being written to disk.')
+
+        self._index_path = index_path
+        self._file = open(index_path + '.tmp', 'wb')
+        self._flush()
+
+    def close(self, data_path: str = None):
+        """!
+        @brief Write any remaining buffered entries to the `.p1i` file being generated by @ref stream_to_file(), and
+               move the completed file to its final path.
+
+        The generated file can then be loaded using `FileIndex(index_path=index_path)`, which memory-maps the file
+        contents.
+
+        @param data_path The path to the `.p1log` file. If specified, an EOF marker containing the size of the data
+               file will be appended to the index.
+        """
+        if self._file is None:
+            return
+
+        self._flush()
+
+        f = self._file
+        self._file = None
+
+        try:
+            # Similar to FileIndex.save(), do not write an empty index file.
+            if self._num_written == 0:
+                f.close()
+                os.remove(f.name)
+                return
+
+            with f:
+                if data_path is not None:
+                    FileIndex._write_marker(f, data_path)
+
+            os.replace(f.name, self._index_path)
+        except Exception:
+            FileIndexBuilder._discard(f)
+            raise
+
+    def abort(self):
+        """!
+        @brief Stop writing the `.p1i` file being generated by @ref stream_to_file() and delete the incomplete file.
+        """
+        if self._file is not None:
+            f = self._file
+            self._file = None
+            FileIndexBuilder._discard(f)
+
+    @staticmethod
+    def _discard(f):
+        f.close()
+        if os.path.exists(f.name):
+            os.remove(f.name)
+
     def to_index(self):
         """!
         @brief Construct a @ref FileIndex from the current set of data.
 
         @return The generated @ref FileIndex instance.
         """
-        return FileIndex(data=self.raw_data)
+        if self._file is not None or self._num_written > 0:
+            raise ValueError('Index entries were written to disk. Load the index file instead.')
+
+        num_entries = self._num_entries
+        return FileIndex._from_columns(self._time[:num_entries].copy(), self._type[:num_entries].copy(),
+                                       self._offset[:num_entries].copy())
+
+    def _grow(self):
+        capacity = 2 * len(self._time)
+        for name in ('_time', '_type', '_offset'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _extend(self, time, type, offset):
+        count = len(time)
+        while self._num_entries + count > len(self._time):
+            if self._file is not None and self._num_entries > 0 and len(self._time) >= self._STREAM_BUFFER_SIZE:
+                self._flush()
+            else:
+                self._grow()
+
+        idx = slice(self._num_entries, self._num_entries + count)
+        self._time[idx] = time
+        self._type[idx] = type
+        self._offset[idx] = offset
+        self._num_entries += count
+
+    def _flush(self):
+        num_entries = self._num_entries
+        if num_entries > 0:
+            raw_data = FileIndex._to_raw(self._time[:num_entries], self._type[:num_entries], self._offset[:num_entries])
+            raw_data.tofile(self._file)
+            self._num_written += num_entries
+            self._num_entries = 0
 
     def __len__(self):
-        return len(self.raw_data)
+        return self._num_written + self._num_entries
+
+    def __del__(self):
+        # If the index was not completed (e.g., the data file was not read to the end), delete the temporary file.
+        self.abort()
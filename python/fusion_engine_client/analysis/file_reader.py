@@ -5,6 +5,7 @@ import copy
 from datetime import datetime
 import io
 import logging
+import mmap
 import os
 
 import numpy as np
@@ -106,6 +107,7 @@ class FileReader(object):
         @param path The path to a FusionEngine binary file to open.
         """
         self.file = None
+        self.mmap = None
         self.file_size = 0
         self.data: Dict[MessageType, MessageData] = {}
         self.t0 = None
@@ -139,6 +141,14 @@ class FileReader(object):
         if self.file_size == 0:
             raise RuntimeError("File '%s' is empty." % path)
 
+        # If possible, memory-map the file and read data directly from the mapped pages rather than copying it through
+        # the file object's buffer on every read() call. Some file objects (e.g., io.BytesIO) do not have an underlying
+        # file descriptor. In that case, read from the file object directly.
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (io.UnsupportedOperation, AttributeError, OSError, ValueError):
+            self.mmap = None
+
         # Load the data index file if present.
         index_path = FileIndex.get_path(self.file.name)
         have_index = os.path.exists(index_path)
@@ -181,6 +191,10 @@ class FileReader(object):
         """!
         @brief Close the file.
         """
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
         if self.file is not None:
             self.file = None
 
@@ -192,7 +206,10 @@ class FileReader(object):
             # We'll read pose data (doesn't actually matter which). Store the currently cached data and restore it when
             # we're done. That way if the user already did a read (with generate_index == False), they don't have to
             # re-read the data if they try to use it again.
-            prev_data = self.data.get(MessageType.POSE, None)
+            #
+            # Remove the cached data before reading. Otherwise, if pose data was already read with the same parameters
+            # (e.g., by the system t0 read in open()), read() will return the cached data and skip generating the index.
+            prev_data = self.data.pop(MessageType.POSE, None)
 
             self.read(message_types=[MessageType.POSE], max_messages=1, generate_index=True)
 
@@ -347,12 +364,16 @@ class FileReader(object):
         else:
             system_reference_time_sec = None
 
+        # Read from the memory-mapped file if available.
+        file = self.mmap if self.mmap is not None else self.file
+
         # If there's an index file, use it to determine the offsets to all the messages we're interested in.
         if self.index is not None and not ignore_index:
-            data_index = self.index[needed_message_types]
-
             # If t0 has never been set, this is probably the "first message" read done in open() to set t0. Ignore the
             # time range.
+            start_time = None
+            end_time = None
+            hint = None
             if time_range_specified and self.t0 is not None:
                 start_time = None if time_range[0] is None else (time_range[0] + p1_reference_time_sec)
                 end_time = None if time_range[1] is None else (time_range[1] + p1_reference_time_sec)
@@ -363,7 +384,9 @@ class FileReader(object):
                 # time range, and we will decode and filter them later based on their system timestamps.
                 hint = 'all_nans' if system_time_messages_requested else None
 
-                data_index = data_index[start_time:end_time:hint]
+            # Select the message types and time range in a single pass over the index.
+            data_index = self.index.filter(message_types=needed_message_types, start=start_time, stop=end_time,
+                                           hint=hint)
 
             if not ignore_index_max_messages:
                 if max_messages > 0:
@@ -378,7 +401,7 @@ class FileReader(object):
         else:
             data_offsets = None
             index_builder = FileIndexBuilder()
-            self.file.seek(0, 0)
+            file.seek(0, 0)
 
             if generate_index:
                 self.logger.debug('Reading all contents to generate index file.')
@@ -407,12 +430,12 @@ class FileReader(object):
                     break
 
                 message_offset_bytes = data_offsets[index_count]
-                self.file.seek(message_offset_bytes, io.SEEK_SET)
+                file.seek(message_offset_bytes, io.SEEK_SET)
                 index_count += 1
             else:
-                message_offset_bytes = self.file.tell()
+                message_offset_bytes = file.tell()
 
-            buffer = self.file.read(HEADER_SIZE)
+            buffer = file.read(HEADER_SIZE)
             if len(buffer) == 0:
                 break
 
@@ -443,7 +466,7 @@ class FileReader(object):
 
             # Read the message payload and append it to the header.
             try:
-                buffer += self.file.read(header.payload_size_bytes)
+                buffer += file.read(header.payload_size_bytes)
             except Exception as e:
                 self.logger.error('Error reading %s payload @ %d: %s' %
                                   (header.get_type_string(), message_offset_bytes, repr(e)))
@@ -461,7 +484,7 @@ class FileReader(object):
                                   (header.get_type_string(), message_offset_bytes, repr(e)))
                 break
 
-            total_bytes_read = self.file.tell()
+            total_bytes_read = file.tell()
 
             if total_bytes_read - last_print_bytes > 10e6:
                 elapsed_sec = (datetime.now() - start_time).total_seconds()
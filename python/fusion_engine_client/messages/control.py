@@ -379,6 +379,16 @@ class EventNotificationMessage(MessagePayload):
     def calcsize(self) -> int:
         return len(self.pack())
 
+    @classmethod
+    def to_numpy(cls, messages):
+        result = {
+            'action': np.array([int(m.action) for m in messages], dtype=int),
+            'system_time_ns': np.array([m.system_time_ns for m in messages], dtype=np.int64),
+            'event_flags': np.array([m.event_flags for m in messages], dtype=np.uint64),
+            'event_description': np.array([m.event_description for m in messages], dtype=object),
+        }
+        return result
+
 
 class ShutdownRequest(MessagePayload):
     """!
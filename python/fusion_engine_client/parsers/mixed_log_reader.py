@@ -103,8 +103,11 @@ class MixedLogReader(object):
                 self.index = None
                 self.index_builder = file_index.FileIndexBuilder() if generate_index else None
 
+        # The generated index is not used by the reader itself, so write the entries to disk as they are found rather
+        # than holding the entire index in memory.
         if self.index_builder is not None:
             self.logger.debug("Generating index file '%s'." % self.index_path)
+            self.index_builder.stream_to_file(self.index_path)
 
     def have_index(self):
         return self.index is not None
@@ -246,7 +249,7 @@ class MixedLogReader(object):
         # If we are creating an index file, save it now.
         if self.index_builder is not None:
             self.logger.debug("Saving index file as '%s'." % self.index_path)
-            self.index_builder.save(self.index_path, self.input_file.name)
+            self.index_builder.close(self.input_file.name)
 
         # Finished iterating.
         raise StopIteration()
@@ -274,7 +277,7 @@ class MixedLogReader(object):
             if self.next_index_elem == len(self.index):
                 return False
             else:
-                offset_bytes = self.index._data['offset'][self.next_index_elem]
+                offset_bytes = self.index.offset[self.next_index_elem]
                 self.next_index_elem += 1
                 self.input_file.seek(offset_bytes, os.SEEK_SET)
                 return True
@@ -313,30 +313,40 @@ def extract_fusion_engine_log(input_path, output_path=None, warn_on_gaps=True, r
     if output_path is None:
         output_path = os.path.splitext(input_path)[0] + '.p1log'
 
-    index_builder = FileIndexBuilder() if generate_index else None
-
-    with open(input_path, 'rb') as in_fd, open(output_path, 'wb') as out_path:
-        reader = MixedLogReader(in_fd, warn_on_gaps=warn_on_gaps, generate_index=False,
-                                return_header=True, return_payload=True, return_bytes=True, return_offset=False)
-        for header, payload, data in reader:
-            if index_builder is not None:
-                p1_time = payload.get_p1_time() if payload is not None else None
-                index_builder.append(message_type=header.message_type, offset_bytes=out_path.tell(),
-                                     p1_time=p1_time)
-            out_path.write(data)
-
-        if reader.valid_count > 0:
-            _logger.debug('Found %d valid FusionEngine messages.' % reader.valid_count)
-            for type, count in reader.message_counts.items():
-                _logger.debug('  %s: %d' % (MessageType.get_type_string(type), count))
-        else:
-            _logger.debug('No FusionEngine messages found.')
-            os.remove(output_path)
-
-    if index_builder is not None:
+    if generate_index:
         index_path = FileIndex.get_path(output_path)
-        _logger.debug("Saving index file as '%s'." % index_path)
-        index_builder.save(FileIndex.get_path(output_path), output_path)
+        _logger.debug("Generating index file '%s'." % index_path)
+        index_builder = FileIndexBuilder()
+        index_builder.stream_to_file(index_path)
+    else:
+        index_builder = None
+
+    try:
+        with open(input_path, 'rb') as in_fd, open(output_path, 'wb') as out_path:
+            reader = MixedLogReader(in_fd, warn_on_gaps=warn_on_gaps, generate_index=False,
+                                    return_header=True, return_payload=True, return_bytes=True, return_offset=False)
+            for header, payload, data in reader:
+                if index_builder is not None:
+                    p1_time = payload.get_p1_time() if payload is not None else None
+                    index_builder.append(message_type=header.message_type, offset_bytes=out_path.tell(),
+                                         p1_time=p1_time)
+                out_path.write(data)
+
+            if reader.valid_count > 0:
+                _logger.debug('Found %d valid FusionEngine messages.' % reader.valid_count)
+                for type, count in reader.message_counts.items():
+                    _logger.debug('  %s: %d' % (MessageType.get_type_string(type), count))
+            else:
+                _logger.debug('No FusionEngine messages found.')
+                os.remove(output_path)
+
+        if index_builder is not None:
+            _logger.debug("Saving index file as '%s'." % index_path)
+            index_builder.close(output_path)
+    finally:
+        # If an error occurred before the index was completed, delete the partial index file.
+        if index_builder is not None:
+            index_builder.abort()
 
     if return_counts:
         return reader.valid_count, reader.message_counts
@@ -13,7 +13,6 @@ setup(
             'argparse-formatter>=1.4',
             'gpstime>=0.6.2',
             'plotly>=4.0.0',
-            'pymap3d>=2.4.3',
         ],
     },
 )
@@ -3,7 +3,7 @@ import os
 import numpy as np
 import pytest
 
-from fusion_engine_client.analysis.file_index import FileIndex, FileIndexBuilder
+from fusion_engine_client.analysis.file_index import FileIndex, FileIndexBuilder, FileIndexEntry
 from fusion_engine_client.messages import MessageType, Timestamp, message_type_to_class
 from fusion_engine_client.parsers import FusionEngineEncoder
 
@@ -41,6 +41,20 @@ def test_index():
     assert (index.offset[idx] == [e[2] for e in raw]).all()
 
 
+def test_index_unsigned_offset():
+    # Arrays using the previous unsigned offset type are converted.
+    data = np.array([(np.nan if e[0] is None else float(e[0]), e[1], e[2]) for e in RAW_DATA],
+                    dtype=[('time', '<f8'), ('type', '<u2'), ('offset', '<u8')])
+    index = FileIndex(data=data)
+    assert len(index) == len(RAW_DATA)
+    assert index.offset.dtype == FileIndex._DTYPE['offset']
+    assert (index.offset == [e[2] for e in RAW_DATA]).all()
+    assert _test_time(index.time, RAW_DATA)
+
+    with pytest.raises(ValueError):
+        FileIndex(data=np.zeros(3, dtype=[('a', '<f8'), ('b', '<u2')]))
+
+
 def test_iterator():
     index = FileIndex(data=RAW_DATA)
     for i, entry in enumerate(index):
@@ -60,15 +74,29 @@ def test_type_slice():
     assert len(pose_index) == len(raw)
     assert (pose_index.offset == [e[2] for e in raw]).all()
 
+    # Entries for multiple types are returned in file order regardless of the order requested.
+    pose_index = index[(MessageType.GNSS_INFO, MessageType.POSE)]
+    assert (pose_index.offset == [e[2] for e in raw]).all()
+
+    # Type not present in the index.
+    imu_index = index[MessageType.IMU_MEASUREMENT]
+    assert len(imu_index) == 0
+
 
 def test_index_slice():
     index = FileIndex(data=RAW_DATA)
 
     # Access a single element.
-    sliced_index = index[3]
-    raw = [RAW_DATA[3]]
-    assert _test_time(sliced_index.time, raw)
-    assert (sliced_index.offset == [e[2] for e in raw]).all()
+    entry = index[3]
+    assert isinstance(entry, FileIndexEntry)
+    assert float(entry.time) == float(RAW_DATA[3][0])
+    assert entry.type == RAW_DATA[3][1]
+    assert entry.offset == RAW_DATA[3][2]
+
+    entry = index[-3]
+    assert np.isnan(float(entry.time))
+    assert entry.type == RAW_DATA[-3][1]
+    assert entry.offset == RAW_DATA[-3][2]
 
     # Access to the end.
     sliced_index = index[3:]
@@ -131,6 +159,69 @@ def test_time_slice():
     assert _test_time(sliced_index.time, raw)
     assert (sliced_index.offset == [e[2] for e in raw]).all()
 
+    # Range extends past the end of the data.
+    sliced_index = index[2.0:10.0]
+    raw = RAW_DATA[_lower_bound(2.0):]
+    assert _test_time(sliced_index.time, raw)
+    assert (sliced_index.offset == [e[2] for e in raw]).all()
+
+    # Range starts after the end of the data.
+    sliced_index = index[10.0:]
+    assert len(sliced_index) == 0
+
+
+def test_filter():
+    index = FileIndex(data=RAW_DATA)
+
+    for hint in ('include_nans', 'remove_nans', 'all_nans'):
+        for types in (MessageType.POSE, (MessageType.POSE, MessageType.VERSION_INFO)):
+            for start, stop in ((None, None), (2.0, None), (None, 3.0), (2.0, 3.0), (10.0, None)):
+                expected = index[types].get_time_range(start, stop, hint)
+                filtered = index.filter(message_types=types, start=start, stop=stop, hint=hint)
+                assert (filtered.offset == expected.offset).all()
+
+    # No message types specified.
+    filtered = index.filter(start=2.0, stop=3.0)
+    expected = index[2.0:3.0]
+    assert (filtered.offset == expected.offset).all()
+
+    # Entries of the selected type without P1 time next to the range boundaries. The boundaries are determined by the
+    # times of the selected entries only, not by entries of other types.
+    index = FileIndex(data=[
+        (Timestamp(2.0), MessageType.GNSS_INFO, 0),
+        (None, MessageType.POSE, 10),
+        (Timestamp(3.0), MessageType.POSE, 20),
+        (Timestamp(4.0), MessageType.GNSS_INFO, 30),
+        (None, MessageType.POSE, 40),
+        (Timestamp(5.0), MessageType.POSE, 50),
+    ])
+    for hint in ('include_nans', 'remove_nans', 'all_nans'):
+        for start, stop in ((2.0, None), (None, 4.0), (2.0, 4.0), (3.0, 1.0)):
+            expected = index[MessageType.POSE].get_time_range(start, stop, hint)
+            filtered = index.filter(message_types=MessageType.POSE, start=start, stop=stop, hint=hint)
+            assert list(filtered.offset) == list(expected.offset)
+
+    assert list(index.filter(message_types=MessageType.POSE, start=2.0).offset) == [20, 40, 50]
+    assert list(index.filter(message_types=MessageType.POSE, start=2.0, stop=4.0).offset) == [20, 40]
+    assert list(index.filter(message_types=MessageType.POSE, start=2.0, stop=4.0, hint='all_nans').offset) == \
+        [10, 20, 40]
+
+
+def test_time_slice_hints():
+    index = FileIndex(data=RAW_DATA)
+    raw_offsets = np.array([e[2] for e in RAW_DATA])
+    raw_is_nan = np.array([e[0] is None for e in RAW_DATA])
+
+    # The time range [2.0, 3.0) covers entries 2 through 4, including the nan entry at 4.
+    in_range = np.zeros(len(RAW_DATA), dtype=bool)
+    in_range[2:5] = True
+
+    sliced_index = index[2.0:3.0:'remove_nans']
+    assert (sliced_index.offset == raw_offsets[in_range & ~raw_is_nan]).all()
+
+    sliced_index = index[2.0:3.0:'all_nans']
+    assert (sliced_index.offset == raw_offsets[in_range | raw_is_nan]).all()
+
 
 def test_empty_index():
     index = FileIndex()
@@ -154,6 +245,21 @@ def test_builder(tmpdir):
     assert os.path.getsize(index_path) > 0
 
 
+def test_builder_large():
+    # Add enough entries to require the builder to grow its buffers several times.
+    num_entries = 5000
+    builder = FileIndexBuilder()
+    for i in range(num_entries):
+        builder.append(p1_time=Timestamp(float(i)) if i % 2 == 0 else None, message_type=MessageType.POSE,
+                       offset_bytes=10 * i)
+
+    index = builder.to_index()
+    assert len(index) == num_entries
+    assert (index.offset == np.arange(num_entries) * 10).all()
+    assert (index.time[::2] == np.arange(0, num_entries, 2)).all()
+    assert np.isnan(index.time[1::2]).all()
+
+
 @pytest.fixture
 def data_path(tmpdir):
     prefix = tmpdir.join('my_data')
@@ -184,6 +290,9 @@ def test_validate_good(data_path):
     index_path = FileIndex.get_path(data_path)
     index = FileIndex(index_path=index_path, data_path=data_path)
     assert len(index) == len(RAW_DATA)
+    for column in (index.time, index.type, index.offset):
+        assert column.flags['C_CONTIGUOUS']
+    assert _test_time(index.time, RAW_DATA)
 
 
 def test_validate_index_empty(data_path):
@@ -242,3 +351,73 @@ def test_validate_data_too_large(data_path):
 
     with pytest.raises(ValueError):
         index = FileIndex(index_path=index_path, data_path=data_path)
+
+
+def test_builder_stream(tmpdir):
+    data_path = str(tmpdir.join('my_data.p1log'))
+    with open(data_path, 'wb') as f:
+        f.write(b'\x00' * 100)
+
+    # Add enough entries to require several writes to disk.
+    num_entries = FileIndexBuilder._STREAM_BUFFER_SIZE * 2 + 100
+    builder = FileIndexBuilder()
+    index_path = str(tmpdir.join('my_data.p1i'))
+    builder.stream_to_file(index_path)
+    for i in range(num_entries):
+        builder.append(p1_time=Timestamp(float(i)) if i % 2 == 0 else None, message_type=MessageType.POSE,
+                       offset_bytes=i)
+    assert len(builder) == num_entries
+    builder.close(data_path)
+
+    # Load the file. The size in the EOF marker matches the data file.
+    index = FileIndex(index_path=index_path, data_path=None)
+    assert len(index) == num_entries
+    assert (index.offset == np.arange(num_entries)).all()
+    assert (index.time[::2] == np.arange(0, num_entries, 2)).all()
+    assert np.isnan(index.time[1::2]).all()
+
+    # The last entry is the EOF marker.
+    raw_data = np.fromfile(index_path, dtype=FileIndex._RAW_DTYPE)
+    assert len(raw_data) == num_entries + 1
+    assert raw_data['type'][-1] == MessageType.INVALID
+    assert raw_data['offset'][-1] == 100
+
+
+def test_builder_stream_empty(tmpdir):
+    builder = FileIndexBuilder()
+    index_path = str(tmpdir.join('my_data.p1i'))
+    builder.stream_to_file(index_path)
+    builder.close()
+    assert not os.path.exists(index_path)
+
+
+def test_builder_from_file(data_path):
+    index = FileIndexBuilder().from_file(str(data_path))
+    expected = FileIndex(index_path=FileIndex.get_path(data_path), data_path=data_path)
+    assert len(index) == len(expected)
+    assert (index.type == expected.type).all()
+    assert (index.offset == expected.offset).all()
+    assert _test_time(index.time, RAW_DATA)
+
+
+def test_builder_stream_abort(data_path):
+    index_path = FileIndex.get_path(data_path)
+    with open(index_path, 'rb') as f:
+        original_contents = f.read()
+
+    # An incomplete index is written to a temporary file, and does not replace the existing index.
+    builder = FileIndexBuilder()
+    builder.stream_to_file(index_path)
+    builder.append(p1_time=None, message_type=MessageType.POSE, offset_bytes=0)
+    builder.abort()
+    assert not os.path.exists(index_path + '.tmp')
+    with open(index_path, 'rb') as f:
+        assert f.read() == original_contents
+
+    # Same if the builder is discarded without being closed.
+    builder = FileIndexBuilder()
+    builder.stream_to_file(index_path)
+    del builder
+    assert not os.path.exists(index_path + '.tmp')
+    with open(index_path, 'rb') as f:
+        assert f.read() == original_contents
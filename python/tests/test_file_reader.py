@@ -1,7 +1,9 @@
 import numpy as np
+import pytest
 
 from fusion_engine_client.analysis.file_reader import FileReader, MessageData, TimeAlignmentMode
 from fusion_engine_client.messages import *
+from fusion_engine_client.parsers import FusionEngineEncoder
 
 
 def setup():
@@ -95,3 +97,44 @@ def test_time_align_specific():
     assert float(data[PoseAuxMessage.MESSAGE_TYPE].messages[1].p1_time) == 3.0
     assert len(data[GNSSInfoMessage.MESSAGE_TYPE].messages) == 1
     assert float(data[GNSSInfoMessage.MESSAGE_TYPE].messages[0].p1_time) == 2.0
+
+
+@pytest.fixture
+def data_path(tmpdir):
+    data_path = tmpdir.join('my_data.p1log')
+
+    encoder = FusionEngineEncoder()
+    with open(data_path, 'wb') as f:
+        for i in range(3):
+            message = PoseMessage()
+            message.p1_time = Timestamp(i + 1.0)
+            message.solution_type = SolutionType.RTKFixed
+            f.write(encoder.encode_message(message))
+
+            message = GNSSInfoMessage()
+            message.p1_time = Timestamp(i + 1.0)
+            f.write(encoder.encode_message(message))
+
+    return str(data_path)
+
+
+def test_read_cached(data_path):
+    reader = FileReader(data_path)
+    result = reader.read(message_types=[PoseMessage], return_numpy=True)
+    pose_data = result[PoseMessage.MESSAGE_TYPE]
+    assert len(pose_data.p1_time) == 3
+
+    # Repeated reads with the same parameters should return the cached data without touching the file.
+    reader.close()
+    result = reader.read(message_types=[PoseMessage], return_numpy=True)
+    assert result[PoseMessage.MESSAGE_TYPE] is pose_data
+    assert len(pose_data.p1_time) == 3
+
+
+def test_generate_index(data_path):
+    reader = FileReader(data_path)
+    assert reader.index is None
+
+    reader.generate_index()
+    assert reader.index is not None
+    assert len(reader.index) == 6